@@ -0,0 +1,1231 @@
+"""Дискретный логарифм: найти x, для которого a^x = y (mod p).
+
+bsgs - метод Шенкса "шаг младенца - шаг великана" в нотации lab2:
+таблица A_j = y * a^j (0 <= j < m), шаги B_i = a^(i*m) (1 <= i <= k),
+при совпадении A_j = B_i ответ x = i*m - j.
+
+Для p < 2^32 (vecmod.supports) таблица строится и хранится в numpy:
+отсортированный массив значений uint64 и массив индексов - 16 байт на
+элемент вместо словаря целых Python. Шаги великана проверяются блоками
+через searchsorted до первого совпадения. Без numpy и для больших p
+работает тот же алгоритм на словаре.
+
+rho (ро-метод Полларда) и kangaroo (лямбда-метод, x в известном
+интервале) обходятся памятью O(1): случайное блуждание по степеням a
+и y, цикл ищется методом Брента. При workers > 1 блуждания идут в
+процессах пула, а в общую таблицу процесса-родителя попадают только
+выделенные точки (младшие биты равны нулю); встреча двух блужданий в
+выделенной точке даёт ответ.
+
+pohlig_hellman раскладывает порядок (p - 1) на простые q^e и решает
+задачу в каждой подгруппе порядка q отдельно: работа порядка sqrt
+наибольшего q вместо sqrt(p).
+
+DiskTable - таблица шагов младенца a^j в файле для p до 2^52, когда
+она не помещается в память: строится кусками с внешней сортировкой
+в пределах заданного бюджета памяти, поиск идёт через mmap.
+
+parallel_bsgs делит BSGS между процессами: куски таблицы a^j строят
+процессы пула прямо в multiprocessing.shared_memory, шаги великана
+делятся на диапазоны, первый нашедший ответ останавливает остальных.
+Сравнение с одним процессом: python dlog.py bench [биты] [процессы].
+
+index_calculus - метод исчисления индексов для p, которые уже не по
+силам BSGS и rho: логарифмы малых простых (факторной базы) находятся
+из соотношений a^k = произведение малых простых, затем логарифм y -
+из одного гладкого y * a^s.
+
+DlogSolver(a, p) нужен, когда логарифмов по одному основанию много:
+таблица шагов великана строится один раз (и сохраняется на диск), на
+каждый y остаются только его шаги младенца.
+
+solve_dlog(a, y, p, method="auto") при заданном интервале берёт
+kangaroo, иначе Полига-Хеллмана; в подгруппах - BSGS, пока таблица
+помещается в DLOG_MEMORY байт, дальше rho.
+"""
+import json
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from multiprocessing import shared_memory
+import vecmod
+from vecmod import np
+from modarith import primes_below
+from primes import factorize
+
+# Длина блока шагов великана в векторном варианте
+GIANT_BLOCK = 1 << 14
+# Каталог сохранённых таблиц DlogSolver
+DLOG_TABLE_DIR = os.environ.get(
+    "DLOG_TABLE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "dlog_tables"),
+)
+# Бюджет памяти таблицы BSGS для solve_dlog(method="auto"), байт
+DLOG_MEMORY = int(os.environ.get("DLOG_MEMORY", str(256 << 20)))
+# Число процессов для rho и kangaroo по умолчанию (1 - без пула)
+DLOG_WORKERS = int(os.environ.get("DLOG_WORKERS", "1"))
+# Число классов r-добавочного блуждания ро-метода (Теске: 20 достаточно)
+RHO_PARTITIONS = 20
+# Сколько раз ро-метод и кенгуру начинают заново, прежде чем сдаться
+RESTARTS = 8
+# Наибольшее число кандидатов при решении сравнения после совпадения
+MAX_CANDIDATES = 1 << 12
+# На сколько делителей порядка пробовать сравнение (порядок a может
+# быть меньше p - 1, а соотношение верно только по модулю порядка)
+MAX_COFACTOR = 1000
+# Сколько выделенных точек в среднем приходится на ожидаемый путь
+DP_PER_WALK = 1 << 8
+# Шагов блуждания в одной задаче пула
+WALK_STEPS = 1 << 16
+# На сколько диапазонов шагов великана на процесс делит parallel_bsgs
+GIANT_TASKS_PER_WORKER = 4
+# Простые множители p - 1 от этой границы index_calculus решает через
+# факторную базу, меньшие - как в методе Полига-Хеллмана
+IC_MIN_PRIME = 1 << 16
+# Соотношений сверх размера факторной базы
+IC_EXTRA_RELATIONS = 20
+# Кандидатов a^k в одной задаче сбора соотношений
+IC_BATCH = 2000
+# Гладких y * a^s с неизвестными логарифмами, после которых index_calculus
+# добирает соотношения
+IC_DESCENT_TRIES = 20
+
+
+def _mulmod(a, b, p):
+    """a * b mod p над массивами uint64: напрямую до 2^32, дальше mul_wide"""
+    if p < vecmod.VEC_MAX_MODULUS:
+        return a * b % np.uint64(p)
+    return vecmod.mul_wide(a, b, p)
+
+
+def _powers(base, count, p):
+    """[base^0, ..., base^(count-1)] mod p массивом uint64.
+
+    Массив удваивается: следующая половина - это уже готовая, умноженная
+    на base^len, поэтому операций над массивами порядка log(count).
+    """
+    result = np.ones(count, dtype=np.uint64)
+    n = 1
+    step = base % p
+    while n < count:
+        end = min(2 * n, count)
+        result[n:end] = _mulmod(result[:end - n], np.uint64(step), p)
+        n = end
+        step = step * step % p
+    return result
+
+
+def _baby_steps(a, y, m, p):
+    """Таблица y * a^j (j < m): отсортированные значения и их индексы j.
+
+    При повторах значений берётся наибольший j, как у словаря в lab2.
+    """
+    A = _powers(a, m, p) * np.uint64(y % p) % np.uint64(p)
+    order = np.argsort(A, kind='stable')
+    return A[order], order
+
+
+def _bsgs_vector(a, y, p, m, k):
+    values, index = _baby_steps(a, y, m, p)
+    P = np.uint64(p)
+    am = pow(a, m, p)
+    block = min(k, GIANT_BLOCK)
+    steps = _powers(am, block, p)
+    start = am  # a^(i*m) для первого i блока
+    for i0 in range(1, k + 1, block):
+        count = min(block, k + 1 - i0)
+        B = steps[:count] * np.uint64(start) % P
+        pos = np.searchsorted(values, B, side='right') - 1
+        hit = (pos >= 0) & (values[np.maximum(pos, 0)] == B)
+        if hit.any():
+            t = int(np.argmax(hit))
+            return int(index[pos[t]]), i0 + t
+        start = start * pow(am, count, p) % p
+    return None
+
+
+def _bsgs_dict(a, y, p, m, k):
+    table = {}
+    v = y % p
+    for j in range(m):
+        table[v] = j
+        v = v * a % p
+    am = pow(a, m, p)
+    v = am
+    for i in range(1, k + 1):
+        j = table.get(v)
+        if j is not None:
+            return j, i
+        v = v * am % p
+    return None
+
+
+def bsgs(a, y, p, order=None, verbose=False):
+    """x с a^x = y (mod p) или None, если y не степень a.
+
+    order - порядок a (или его кратное), по умолчанию p - 1; шагов
+    порядка sqrt(order). Ответ приводится по модулю order.
+    """
+    a %= p
+    if a == 0:
+        return None
+    n = order or p - 1
+    k = m = math.isqrt(n) + 1
+    if verbose:
+        print(k, m)
+    if vecmod.supports(p):
+        found = _bsgs_vector(a, y, p, m, k)
+    else:
+        found = _bsgs_dict(a, y, p, m, k)
+    if found is None:
+        return None
+    j, i = found
+    if verbose:
+        print("\nj i:")
+        print(j, i)
+    x = (i * m - j) % n
+    # при order, не кратном порядку a, совпадение в таблице ещё не ответ
+    return x if pow(a, x, p) == y % p else None
+
+
+def _candidates(b, c, n):
+    """Решения b*x = c (mod n); [] если их нет или больше MAX_CANDIDATES"""
+    g = math.gcd(b, n)
+    if c % g or g > MAX_CANDIDATES:
+        return []
+    n0 = n // g
+    x0 = (c // g) * pow(b // g, -1, n0) % n0
+    return [x0 + t * n0 for t in range(g)]
+
+
+def _solve_relation(a, y, p, n, b, c):
+    """x по соотношению b*x = c, верному по модулю порядка a (делителя n)"""
+    for k in range(1, MAX_COFACTOR + 1):
+        if n % k or (k > 1 and pow(a, n // k, p) != 1):
+            continue
+        for x in _candidates(b % (n // k), c % (n // k), n // k):
+            if pow(a, x, p) == y:
+                return x
+    return None
+
+
+def _dp_mask(expected_steps):
+    """Маска выделенных точек: около DP_PER_WALK точек на ожидаемый путь"""
+    bits = max(0, expected_steps.bit_length() - DP_PER_WALK.bit_length())
+    return (1 << bits) - 1
+
+
+def _rho_jumps(a, y, p, n, seed):
+    """Множители r-добавочного блуждания: M_s = a^alpha_s * y^beta_s"""
+    rnd = random.Random(seed)
+    alpha = [rnd.randrange(n) for _ in range(RHO_PARTITIONS)]
+    beta = [rnd.randrange(n) for _ in range(RHO_PARTITIONS)]
+    M = [pow(a, al, p) * pow(y, be, p) % p for al, be in zip(alpha, beta)]
+    return M, alpha, beta
+
+
+def _rho_start(a, y, p, n, rnd):
+    u, v = rnd.randrange(n), rnd.randrange(n)
+    return pow(a, u, p) * pow(y, v, p) % p, u, v
+
+
+def _rho_serial(a, y, p, n):
+    for _ in range(RESTARTS):
+        rnd = random.Random(random.getrandbits(64))
+        M, alpha, beta = _rho_jumps(a, y, p, n, rnd.getrandbits(64))
+        x, u, v = _rho_start(a, y, p, n, rnd)
+        # Брент: сохранённая точка обновляется на степенях двойки
+        X, U, V = x, u, v
+        power = lam = 1
+        while True:
+            s = x % RHO_PARTITIONS
+            x = x * M[s] % p
+            u = (u + alpha[s]) % n
+            v = (v + beta[s]) % n
+            if x == X:
+                break
+            if lam == power:
+                X, U, V = x, u, v
+                power *= 2
+                lam = 0
+            lam += 1
+        # a^U * y^V = a^u * y^v  =>  x * (V - v) = u - U
+        found = _solve_relation(a, y, p, n, V - v, u - U)
+        if found is not None:
+            return found
+    return None
+
+
+def _rho_task(a, y, p, n, jump_seed, mask, seed):
+    """WALK_STEPS шагов блужданий; после выделенной точки - новый старт"""
+    M, alpha, beta = _rho_jumps(a, y, p, n, jump_seed)
+    rnd = random.Random(seed)
+    x, u, v = _rho_start(a, y, p, n, rnd)
+    points = []
+    # без выделенной точки за 20 средних путей блуждание, видимо, зациклилось
+    limit = 20 * (mask + 1)
+    walked = 0
+    for _ in range(WALK_STEPS):
+        s = x % RHO_PARTITIONS
+        x = x * M[s] % p
+        u = (u + alpha[s]) % n
+        v = (v + beta[s]) % n
+        walked += 1
+        if not x & mask:
+            points.append((x, u, v))
+        if not x & mask or walked > limit:
+            x, u, v = _rho_start(a, y, p, n, rnd)
+            walked = 0
+    return points
+
+
+def _collect(task, args, workers, handle, max_tasks):
+    """Раздаёт задачи task(*args, seed) пулу, пока handle не вернёт ответ"""
+    ex = ProcessPoolExecutor(max_workers=workers)
+    try:
+        pending = {ex.submit(task, *args, random.getrandbits(64)) for _ in range(workers)}
+        submitted = workers
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                found = handle(f.result())
+                if found is not None:
+                    return found
+                if submitted < max_tasks:
+                    pending.add(ex.submit(task, *args, random.getrandbits(64)))
+                    submitted += 1
+    finally:
+        ex.shutdown(wait=False, cancel_futures=True)
+    return None
+
+
+def _rho_parallel(a, y, p, n, workers):
+    expected = math.isqrt(n) + 1
+    mask = _dp_mask(expected)
+    jump_seed = random.getrandbits(64)
+    table = {}
+
+    def handle(points):
+        for x, u, v in points:
+            if x not in table:
+                table[x] = (u, v)
+                continue
+            U, V = table[x]
+            if (U, V) != (u, v):
+                found = _solve_relation(a, y, p, n, V - v, u - U)
+                if found is not None:
+                    return found
+        return None
+
+    max_tasks = RESTARTS * (4 * expected // WALK_STEPS + workers)
+    return _collect(_rho_task, (a, y, p, n, jump_seed, mask), workers, handle, max_tasks)
+
+
+def rho(a, y, p, order=None, workers=None):
+    """Ро-метод Полларда: x с a^x = y (mod p) или None.
+
+    order - порядок a или его кратное (по умолчанию p - 1). Ожидаемо
+    около sqrt(order) умножений и O(1) памяти.
+    """
+    n = order or p - 1
+    a %= p
+    y %= p
+    if y == 1:
+        return 0
+    if workers is None:
+        workers = DLOG_WORKERS
+    if workers <= 1:
+        return _rho_serial(a, y, p, n)
+    return _rho_parallel(a, y, p, n, workers)
+
+
+def _kangaroo_jumps(a, p, w, herd=1):
+    """Прыжки 2^s, средняя длина около herd * sqrt(w) / 2"""
+    target = max(1, herd * math.isqrt(w) // 2)
+    k = 1
+    while ((1 << k) - 1) // k < target:
+        k += 1
+    dist = [1 << s for s in range(k)]
+    return [pow(a, d, p) for d in dist], dist
+
+
+def _kangaroo_serial(a, y, p, lo, hi):
+    w = hi - lo
+    J, dist = _kangaroo_jumps(a, p, w)
+    k = len(J)
+    # ручной кенгуру от a^hi оставляет ловушку в конце пути
+    t, dt = pow(a, hi, p), 0
+    for _ in range(2 * math.isqrt(w) + 1):
+        s = t % k
+        t = t * J[s] % p
+        dt += dist[s]
+    for attempt in range(RESTARTS):
+        # дикий кенгуру от y * a^r, при повторных попытках r случайно
+        r = random.randrange(w // 2 + 1) if attempt else 0
+        z, dz = y * pow(a, r, p) % p, 0
+        while lo + r + dz <= hi + dt:
+            if z == t:
+                x = hi + dt - r - dz
+                if pow(a, x, p) == y:
+                    return x
+                break
+            s = z % k
+            z = z * J[s] % p
+            dz += dist[s]
+    return None
+
+
+def _kangaroo_task(a, y, p, lo, hi, herd, mask, seed):
+    """Ручной и дикий кенгуру от случайных стартов до WALK_STEPS шагов.
+
+    Выделенные точки - (точка, ручной ли, показатель): для ручного
+    точка = a^показатель, для дикого точка = y * a^показатель.
+    """
+    w = hi - lo
+    J, dist = _kangaroo_jumps(a, p, w, herd)
+    k = len(J)
+    rnd = random.Random(seed)
+    points = []
+    for tame in (True, False):
+        e = (lo + w // 2 if tame else 0) + rnd.randrange(w // 2 + 1)
+        z = pow(a, e, p) if tame else y * pow(a, e, p) % p
+        for _ in range(WALK_STEPS // 2):
+            s = z % k
+            z = z * J[s] % p
+            e += dist[s]
+            if not z & mask:
+                points.append((z, tame, e))
+    return points
+
+
+def _kangaroo_parallel(a, y, p, lo, hi, workers):
+    w = hi - lo
+    herd = 2 * workers
+    mask = _dp_mask(math.isqrt(w) + 1)
+    tables = {True: {}, False: {}}
+
+    def handle(points):
+        for z, tame, e in points:
+            other = tables[not tame].get(z)
+            if other is not None:
+                x = e - other if tame else other - e
+                if pow(a, x, p) == y:
+                    return x
+            tables[tame][z] = e
+        return None
+
+    max_tasks = RESTARTS * (8 * herd * math.isqrt(w) // WALK_STEPS + workers)
+    return _collect(_kangaroo_task, (a, y, p, lo, hi, herd, mask), workers, handle, max_tasks)
+
+
+def kangaroo(a, y, p, lo, hi, workers=None):
+    """Лямбда-метод Полларда: x из [lo, hi] с a^x = y (mod p) или None.
+
+    Около 2*sqrt(hi - lo) умножений и O(1) памяти независимо от p.
+    """
+    a %= p
+    y %= p
+    if hi - lo < 16:
+        for x in range(lo, hi + 1):
+            if pow(a, x, p) == y:
+                return x
+        return None
+    if workers is None:
+        workers = DLOG_WORKERS
+    if workers <= 1:
+        x = _kangaroo_serial(a, y, p, lo, hi)
+    else:
+        x = _kangaroo_parallel(a, y, p, lo, hi, workers)
+    # совпадение даёт x лишь по модулю порядка a - сдвигаем к lo
+    return None if x is None else lo + (x - lo) % (p - 1)
+
+
+def bsgs_memory(n, p):
+    """Сколько байт займёт таблица BSGS для порядка n"""
+    return (math.isqrt(n) + 1) * (16 if vecmod.supports(p) else 100)
+
+
+def table_path(a, p, vector=None):
+    """Файл таблицы DlogSolver для (a, p): .npz для numpy, иначе .json"""
+    if vector is None:
+        vector = vecmod.supports(p)
+    return os.path.join(DLOG_TABLE_DIR, f"{a % p}_{p}." + ("npz" if vector else "json"))
+
+
+class DlogSolver:
+    """Логарифмы многих y по одному основанию a и модулю p.
+
+    Таблица хранит шаги великана a^(i*m), 1 <= i <= size, size*m >= n;
+    для y перебираются шаги младенца y*a^j (j < m), при совпадении
+    x = i*m - j. На targets целей берётся m = sqrt(n / targets): таблица
+    из sqrt(n * targets) элементов и sqrt(n / targets) шагов на цель,
+    всего порядка sqrt(n * targets) вместо targets * sqrt(n).
+    """
+
+    def __init__(self, a, p, order=None, targets=1, m=None):
+        self.a = a % p
+        self.p = p
+        self.n = order or p - 1
+        self.m = m or max(1, math.isqrt(self.n // max(1, targets)))
+        self.size = -(-self.n // self.m)
+        self.vector = vecmod.supports(p)
+        if self.vector:
+            self._baby = _powers(self.a, self.m, p)
+        self._values = self._index = self._table = None
+
+    def build(self):
+        am = pow(self.a, self.m, self.p)
+        if self.vector:
+            values = _powers(am, self.size, self.p) * np.uint64(am) % np.uint64(self.p)
+            order = np.argsort(values, kind='stable')
+            self._values = values[order]
+            self._index = order + 1
+        else:
+            self._table = {}
+            v = am
+            for i in range(1, self.size + 1):
+                self._table.setdefault(v, i)
+                v = v * am % self.p
+        return self
+
+    def solve(self, y):
+        """x с a^x = y (mod p) или None"""
+        if self._values is None and self._table is None:
+            self.build()
+        p, m = self.p, self.m
+        if self.vector:
+            B = self._baby * np.uint64(y % p) % np.uint64(p)
+            pos = np.minimum(np.searchsorted(self._values, B), len(self._values) - 1)
+            hit = self._values[pos] == B
+            if not hit.any():
+                return None
+            j = int(np.argmax(hit))
+            return (int(self._index[pos[j]]) * m - j) % self.n
+        v = y % p
+        for j in range(m):
+            i = self._table.get(v)
+            if i is not None:
+                return (i * m - j) % self.n
+            v = v * self.a % p
+        return None
+
+    def solve_many(self, ys):
+        return [self.solve(y) for y in ys]
+
+    def save(self, path=None):
+        """Записывает таблицу (по умолчанию в table_path(a, p))"""
+        if self._values is None and self._table is None:
+            self.build()
+        path = path or table_path(self.a, self.p, self.vector)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, 'wb' if self.vector else 'w') as f:
+            if self.vector:
+                np.savez(f, values=self._values, index=self._index,
+                         params=np.array([self.a, self.p, self.n, self.m], dtype=np.uint64))
+            else:
+                json.dump({"a": self.a, "p": self.p, "n": self.n, "m": self.m,
+                           "table": list(self._table.items())}, f)
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, a, p, order=None, path=None):
+        """Решатель с таблицей из файла или None, если файла нет
+        или он построен для другого порядка"""
+        vector = vecmod.supports(p)
+        path = path or table_path(a, p, vector)
+        if not os.path.exists(path):
+            return None
+        if vector:
+            with np.load(path) as data:
+                params = [int(v) for v in data["params"]]
+                values, index = data["values"], data["index"]
+        else:
+            with open(path) as f:
+                data = json.load(f)
+            params = [data["a"], data["p"], data["n"], data["m"]]
+        if params[:3] != [a % p, p, order or p - 1]:
+            return None
+        solver = cls(a, p, order, m=params[3])
+        if vector:
+            solver._values, solver._index = values, index
+        else:
+            solver._table = dict(map(tuple, data["table"]))
+        return solver
+
+    @classmethod
+    def cached(cls, a, p, order=None, targets=1):
+        """Решатель из файла таблицы, а если его нет - новый, сразу сохранённый"""
+        solver = cls.load(a, p, order)
+        if solver is None:
+            solver = cls(a, p, order, targets).build()
+            solver.save()
+        return solver
+
+
+class DiskTable:
+    """Отсортированная таблица a^j (0 <= j < m) mod p в файле.
+
+    Файл: заголовок из 8 чисел uint64 (метка, a, p, n, m, биты корзин),
+    m записей (значение, j) по 16 байт в порядке значений, затем
+    смещения корзин. Корзина - старшие bits битов значения; по смещениям
+    бинарный поиск сразу сужается до нескольких записей.
+
+    Строится внешней сортировкой распределением: куски по memory байт
+    раскладываются по частичным файлам по старшим битам значения, каждый
+    частичный файл сортируется в памяти и дописывается в таблицу.
+    """
+
+    MAGIC = 0x424C54474F4C44  # "DLOGTLB"
+    RECORD = np.dtype([('value', '<u8'), ('index', '<u8')]) if np is not None else None
+    HEADER = 64
+
+    def __init__(self, path):
+        self.path = path
+        header = np.fromfile(path, dtype='<u8', count=8)
+        if len(header) < 8 or int(header[0]) != self.MAGIC:
+            raise ValueError(f"{path} - не файл таблицы DiskTable")
+        self.a, self.p, self.n, self.m, self.bits = (int(v) for v in header[1:6])
+        self.shift = max(0, self.p.bit_length() - self.bits)
+        self.records = np.memmap(path, dtype=self.RECORD, mode='r',
+                                 offset=self.HEADER, shape=(self.m,))
+        self.offsets = np.memmap(path, dtype='<i8', mode='r',
+                                 offset=self.HEADER + self.m * self.RECORD.itemsize,
+                                 shape=((1 << self.bits) + 1,))
+
+    @classmethod
+    def build(cls, a, p, order=None, path=None, memory=None, m=None):
+        """Строит таблицу на math.isqrt(order) + 1 записей, не занимая
+        в памяти больше memory байт (по умолчанию DLOG_MEMORY)"""
+        if not vecmod.supports_wide(p):
+            raise ValueError(f"Модуль {p} не подходит для таблицы на диске")
+        a %= p
+        n = order or p - 1
+        m = m or math.isqrt(n) + 1
+        memory = memory or DLOG_MEMORY
+        path = path or disk_table_path(a, p)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        nbits = p.bit_length()
+        # кусок генерации и частичный файл при сортировке занимают около
+        # 4 записей на элемент (значения, индексы, перестановка, копия)
+        chunk = max(1 << 12, memory // (4 * cls.RECORD.itemsize))
+        parts = 1
+        while m // parts > chunk:
+            parts *= 2
+        part_shift = max(0, nbits - (parts.bit_length() - 1))
+        # около 8 записей на корзину, не больше 2^24 корзин
+        bits = min(24, nbits, max(1, m.bit_length() - 3))
+        counts = np.zeros(1 << bits, dtype=np.int64)
+
+        part_paths = [f"{path}.part{k}" for k in range(parts)]
+        part_files = [open(name, 'wb') for name in part_paths]
+        try:
+            step = np.uint64(pow(a, chunk, p))
+            start = np.uint64(1)
+            for j0 in range(0, m, chunk):
+                count = min(chunk, m - j0)
+                rec = np.empty(count, dtype=cls.RECORD)
+                rec['value'] = _mulmod(_powers(a, count, p), start, p)
+                rec['index'] = np.arange(j0, j0 + count, dtype=np.uint64)
+                counts += np.bincount((rec['value'] >> np.uint64(nbits - bits)).astype(np.int64),
+                                      minlength=1 << bits)
+                part = (rec['value'] >> np.uint64(part_shift)).astype(np.int64)
+                order = np.argsort(part, kind='stable')
+                rec, part = rec[order], part[order]
+                bounds = np.searchsorted(part, np.arange(parts + 1))
+                for k in range(parts):
+                    rec[bounds[k]:bounds[k + 1]].tofile(part_files[k])
+                start = _mulmod(start, step, p)
+        finally:
+            for f in part_files:
+                f.close()
+
+        tmp = path + ".tmp"
+        try:
+            with open(tmp, 'wb') as out:
+                np.array([cls.MAGIC, a, p, n, m, bits, 0, 0], dtype='<u8').tofile(out)
+                for name in part_paths:
+                    rec = np.fromfile(name, dtype=cls.RECORD)
+                    os.remove(name)
+                    rec[np.argsort(rec['value'], kind='stable')].tofile(out)
+                np.concatenate(([0], np.cumsum(counts))).astype('<i8').tofile(out)
+            os.replace(tmp, path)
+        finally:
+            for name in part_paths + [tmp]:
+                if os.path.exists(name):
+                    os.remove(name)
+        return cls(path)
+
+    @classmethod
+    def open_or_build(cls, a, p, order=None, path=None, memory=None):
+        path = path or disk_table_path(a, p)
+        if os.path.exists(path):
+            table = cls(path)
+            if (table.a, table.p, table.n) == (a % p, p, order or p - 1):
+                return table
+            table.close()
+        return cls.build(a, p, order, path, memory)
+
+    def close(self):
+        del self.records, self.offsets
+
+    def lookup(self, values):
+        """Для массива значений: (найдено ли, j) поэлементно.
+
+        Бинарный поиск идёт одновременно по всем значениям внутри их корзин;
+        отсортированные значения читают файл почти последовательно.
+        """
+        values = np.asarray(values, dtype=np.uint64)
+        bucket = (values >> np.uint64(self.shift)).astype(np.int64)
+        lo = np.asarray(self.offsets[bucket])
+        end = np.asarray(self.offsets[bucket + 1])
+        hi = end.copy()
+        keys = self.records['value']
+        active = lo < hi
+        while active.any():
+            mid = (lo + hi) // 2
+            idx = np.flatnonzero(active)
+            less = keys[mid[idx]] < values[idx]
+            lo[idx[less]] = mid[idx[less]] + 1
+            hi[idx[~less]] = mid[idx[~less]]
+            active = lo < hi
+        found = lo < end
+        pos = np.minimum(lo, self.m - 1)
+        found &= keys[pos] == values
+        return found, self.records['index'][pos]
+
+    def solve(self, y, memory=None):
+        """x с a^x = y (mod p) или None: шаги великана y * a^(-i*m) пачками"""
+        p, m = self.p, self.m
+        batch = max(1 << 12, min(1 << 22, (memory or DLOG_MEMORY) // 64))
+        k = -(-self.n // m)
+        giant = pow(self.a, -m, p)
+        steps = _powers(giant, min(batch, k), p)
+        step_batch = pow(giant, len(steps), p)
+        start = y % p
+        for i0 in range(0, k, batch):
+            count = min(batch, k - i0)
+            G = _mulmod(steps[:count], np.uint64(start), p)
+            order = np.argsort(G)
+            found, j = self.lookup(G[order])
+            if found.any():
+                t = np.flatnonzero(found)
+                i = order[t]
+                best = int(np.argmin(i))
+                return ((i0 + int(i[best])) * m + int(j[t[best]])) % self.n
+            start = start * step_batch % p
+        return None
+
+
+def disk_table_path(a, p):
+    return os.path.join(DLOG_TABLE_DIR, f"{a % p}_{p}.tbl")
+
+
+def disk_bsgs(a, y, p, order=None, path=None, memory=None):
+    """BSGS с таблицей на диске (DiskTable), построенной при первом вызове"""
+    table = DiskTable.open_or_build(a, p, order, path, memory)
+    try:
+        return table.solve(y, memory)
+    finally:
+        table.close()
+
+
+def _shared_table(shm, m):
+    """Представления блока общей памяти: флаг остановки, значения a^j, индексы j"""
+    buf = np.ndarray((2 * m + 1,), dtype=np.uint64, buffer=shm.buf)
+    return buf[:1], buf[1:m + 1], buf[m + 1:]
+
+
+def _fill_task(name, m, a, p, j0, j1):
+    """Записывает a^j для j0 <= j < j1 в общую таблицу"""
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        _, values, _ = _shared_table(shm, m)
+        try:
+            values[j0:j1] = _mulmod(_powers(a, j1 - j0, p), np.uint64(pow(a, j0, p)), p)
+        finally:
+            del values
+    finally:
+        shm.close()
+
+
+def _giant_task(name, m, a, y, p, n, i0, i1):
+    """Шаги великана y * a^(-i*m) для i0 <= i < i1; x или None.
+
+    Между блоками проверяется флаг: его поднимает нашедший ответ процесс.
+    """
+    shm = shared_memory.SharedMemory(name=name)
+    flag, values, index = _shared_table(shm, m)
+    try:
+        giant = pow(a, -m, p)
+        block = min(GIANT_BLOCK, i1 - i0)
+        steps = _powers(giant, block, p)
+        step_block = pow(giant, block, p)
+        start = y * pow(giant, i0, p) % p
+        for b0 in range(i0, i1, block):
+            if flag[0]:
+                return None
+            count = min(block, i1 - b0)
+            G = _mulmod(steps[:count], np.uint64(start), p)
+            pos = np.minimum(np.searchsorted(values, G), m - 1)
+            hit = values[pos] == G
+            if hit.any():
+                flag[0] = 1
+                t = int(np.argmax(hit))
+                return ((b0 + t) * m + int(index[pos[t]])) % n
+            start = start * step_block % p
+        return None
+    finally:
+        del flag, values, index
+        shm.close()
+
+
+def _split(count, parts):
+    size = -(-count // parts)
+    return [(lo, min(lo + size, count)) for lo in range(0, count, size)]
+
+
+def parallel_bsgs(a, y, p, order=None, workers=None):
+    """BSGS на workers процессах (по умолчанию все ядра), p < 2^52.
+
+    Таблица a^j (j < m) лежит в shared_memory: процессы пула заполняют
+    свои куски, родитель сортирует. Диапазоны шагов великана раздаются
+    задачами; после первого ответа остальные задачи отменяются, а
+    работающие замечают флаг в общей памяти. При workers = 1 всё то же
+    выполняется в текущем процессе.
+    """
+    if not vecmod.supports_wide(p):
+        raise ValueError(f"Модуль {p} не подходит для parallel_bsgs")
+    a %= p
+    y %= p
+    n = order or p - 1
+    m = math.isqrt(n) + 1
+    k = -(-n // m)
+    workers = workers or os.cpu_count() or 1
+    shm = shared_memory.SharedMemory(create=True, size=8 * (2 * m + 1))
+    ex = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        flag, values, index = _shared_table(shm, m)
+        try:
+            flag[0] = 0
+            shards = _split(m, workers)
+            fill_args = [(shm.name, m, a, p, j0, j1) for j0, j1 in shards]
+            if ex is None:
+                for args in fill_args:
+                    _fill_task(*args)
+            else:
+                for f in [ex.submit(_fill_task, *args) for args in fill_args]:
+                    f.result()
+            order = np.argsort(values)
+            values[:] = values[order]
+            index[:] = order
+        finally:
+            # пока живы представления numpy, close() бросает BufferError и
+            # скрывает исходную ошибку
+            del flag, values, index
+
+        ranges = _split(k, workers * GIANT_TASKS_PER_WORKER)
+        if ex is None:
+            for i0, i1 in ranges:
+                x = _giant_task(shm.name, m, a, y, p, n, i0, i1)
+                if x is not None:
+                    return x
+            return None
+        pending = {ex.submit(_giant_task, shm.name, m, a, y, p, n, i0, i1) for i0, i1 in ranges}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                x = f.result()
+                if x is not None:
+                    return x
+        return None
+    finally:
+        if ex is not None:
+            ex.shutdown(wait=True, cancel_futures=True)
+        shm.close()
+        shm.unlink()
+
+
+def benchmark_parallel(bits=40, workers=None, repeats=3):
+    """Время parallel_bsgs на одном процессе и на workers; ускорение"""
+    from primes import random_prime
+    workers = workers or os.cpu_count() or 1
+    p = random_prime(bits)
+    a = random.randint(2, p - 2)
+    ys = [pow(a, random.randrange(p - 1), p) for _ in range(repeats)]
+    times = {}
+    for w in sorted({1, workers}):
+        t = time.perf_counter()
+        for y in ys:
+            x = parallel_bsgs(a, y, p, workers=w)
+            if x is None or pow(a, x, p) != y:
+                raise AssertionError("parallel_bsgs дал неверный ответ")
+        times[w] = (time.perf_counter() - t) / repeats
+        print(f"p: {bits} бит, процессов {w}: {times[w]:.3f} с на логарифм")
+    print(f"Ускорение: {times[1] / times[workers]:.2f}")
+    return times
+
+
+def _subgroup_dlog(g, h, p, q, workers=None, memory=None):
+    """Логарифм h по основанию g порядка q (простого): BSGS или rho по памяти"""
+    if h == 1:
+        return 0
+    budget = DLOG_MEMORY if memory is None else memory
+    if bsgs_memory(q, p) <= budget:
+        return bsgs(g, h, p, q)
+    return rho(g, h, p, q, workers)
+
+
+def _prime_power_dlog(a, y, p, n, q, e, workers=None, memory=None):
+    """x mod q^f по проекциям a, y в подгруппу порядка q^e: (x_q, f) или None.
+
+    q^f - настоящий порядок проекции a, f <= e (порядок a может быть
+    меньше n). x_q находится по q-ичным цифрам.
+    """
+    c = n // q ** e
+    g, h = pow(a, c, p), pow(y, c, p)
+    f, gq = 0, g
+    while gq != 1:
+        gq = pow(gq, q, p)
+        f += 1
+    gamma = pow(g, q ** (f - 1), p) if f else 1
+    g_inv = pow(g, -1, p)
+    xq = 0
+    for k in range(f):
+        # (g^-xq * h)^(q^(f-1-k)) = gamma^(k-я цифра)
+        hk = pow(pow(g_inv, xq, p) * h % p, q ** (f - 1 - k), p)
+        d = _subgroup_dlog(gamma, hk, p, q, workers, memory)
+        if d is None:
+            return None
+        xq += d * q ** k
+    return xq, f
+
+
+def _crt_add(x, mod, xq, mq):
+    """Гарнер: число, равное x по модулю mod и xq по модулю mq"""
+    return x + mod * ((xq - x) * pow(mod, -1, mq) % mq), mod * mq
+
+
+def _format_factors(n, factors):
+    return f"{n} = " + " * ".join(f"{q}^{e}" if e > 1 else str(q) for q, e in factors.items())
+
+
+def pohlig_hellman(a, y, p, order=None, factors=None, workers=None, memory=None, verbose=False):
+    """Метод Полига-Хеллмана: x с a^x = y (mod p) или None.
+
+    order - порядок a или его кратное (по умолчанию p - 1), factors - его
+    разложение {q: e}, если уже известно. В подгруппе порядка q^e x
+    находится по q-ичным цифрам, ответы собираются по КТО. При verbose
+    печатаются разложение и время по подгруппам.
+    """
+    n = order or p - 1
+    a %= p
+    y %= p
+    if a == 0:
+        # 0 не лежит в Z_p*, порядок проекции в подгруппу не определён
+        return None
+    t = time.perf_counter()
+    if factors is None:
+        factors = factorize(n)
+    if verbose:
+        print(_format_factors(n, factors) + f"  ({time.perf_counter() - t:.3f} с)")
+    x, mod = 0, 1
+    for q, e in factors.items():
+        t = time.perf_counter()
+        found = _prime_power_dlog(a, y, p, n, q, e, workers, memory)
+        if found is None:
+            return None
+        xq, f = found
+        x, mod = _crt_add(x, mod, xq, q ** f)
+        if verbose:
+            print(f"  x ≡ {xq} (mod {q}^{f})  ({time.perf_counter() - t:.3f} с)")
+    # h не из подгруппы g проявляется только здесь
+    return x if pow(a, x, p) == y else None
+
+
+def factor_base_bound(p):
+    """Граница факторной базы порядка L_p[1/2, 0.7]"""
+    lp = math.log(p)
+    return max(100, int(math.exp(0.7 * math.sqrt(lp * math.log(lp)))))
+
+
+def _smooth(z, base, prod):
+    """[(i, e), ...] - разложение z по факторной базе или None.
+
+    Гладкость проверяется повторными НОД с произведением базы, пробное
+    деление - только для гладких z. 0 не раскладывается.
+    """
+    if z == 0:
+        return None
+    r = z
+    g = math.gcd(r, prod)
+    while g > 1:
+        r //= g
+        g = math.gcd(r, g)
+    if r != 1:
+        return None
+    exps = []
+    for i, b in enumerate(base):
+        if z % b == 0:
+            e = 0
+            while z % b == 0:
+                z //= b
+                e += 1
+            exps.append((i, e))
+    return exps
+
+
+def _relation_task(a, p, base, count, seed):
+    """Соотношения (k, разложение a^k) среди count случайных k"""
+    rnd = random.Random(seed)
+    prod = math.prod(base)
+    found = []
+    for _ in range(count):
+        k = rnd.randrange(1, p - 1)
+        exps = _smooth(pow(a, k, p), base, prod)
+        if exps is not None:
+            found.append((k, exps))
+    return found
+
+
+def relations_path(a, p):
+    return os.path.join(DLOG_TABLE_DIR, f"{a % p}_{p}.relations.json")
+
+
+def _load_relations(path, a, p, base_size):
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return []
+    if (data.get("a"), data.get("p"), data.get("base")) != (a, p, base_size):
+        return []
+    return [(k, [tuple(e) for e in exps]) for k, exps in data["relations"]]
+
+
+def _save_relations(path, a, p, base_size, relations):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, 'w') as f:
+        json.dump({"a": a, "p": p, "base": base_size, "relations": relations}, f)
+    os.replace(tmp, path)
+
+
+def collect_relations(a, p, base, need, relations=None, workers=None, checkpoint=None,
+                      verbose=False):
+    """Дополняет relations до need соотношений для факторной базы base.
+
+    После каждой задачи соотношения записываются в checkpoint (если
+    задан), так что прерванный сбор продолжается с того же места.
+    """
+    relations = list(relations or [])
+    seen = {k for k, _ in relations}
+    if workers is None:
+        workers = DLOG_WORKERS
+    printed = [time.perf_counter()]
+
+    def handle(batch):
+        for k, exps in batch:
+            if k not in seen:
+                seen.add(k)
+                relations.append((k, exps))
+        if checkpoint:
+            _save_relations(checkpoint, a, p, len(base), relations)
+        done = len(relations) >= need
+        # прогресс - не чаще раза в секунду
+        if verbose and (done or time.perf_counter() - printed[0] >= 1):
+            printed[0] = time.perf_counter()
+            print(f"  соотношений: {min(len(relations), need)}/{need}")
+        return True if done else None
+
+    if len(relations) >= need:
+        return relations
+    if workers <= 1:
+        while handle(_relation_task(a, p, base, IC_BATCH, random.getrandbits(64))) is None:
+            pass
+    else:
+        _collect(_relation_task, (a, p, base, IC_BATCH), workers, handle, sys.maxsize)
+    return relations
+
+
+def _solve_mod_prime(relations, size, q):
+    """Логарифмы элементов базы по модулю простого q: {номер: логарифм}.
+
+    Структурированный Гаусс: столбцы по возрастанию числа ненулевых
+    элементов, ведущая строка - самая короткая, так строки дольше
+    остаются разреженными. Элементы без ведущей строки остаются
+    неизвестными, как и зависящие от них.
+    """
+    rows = []
+    weight = [0] * size
+    for k, exps in relations:
+        row = {i: e % q for i, e in exps if e % q}
+        for i in row:
+            weight[i] += 1
+        rows.append([row, k % q])
+    pivots = []
+    for col in sorted(range(size), key=weight.__getitem__):
+        with_col = [r for r in rows if col in r[0]]
+        if not with_col:
+            continue
+        pivot = min(with_col, key=lambda r: len(r[0]))
+        rows = [r for r in rows if r is not pivot]
+        row, rhs = pivot
+        inv = pow(row[col], -1, q)
+        row = {j: v * inv % q for j, v in row.items()}
+        rhs = rhs * inv % q
+        for r in with_col:
+            if r is pivot:
+                continue
+            c = r[0].pop(col)
+            for j, v in row.items():
+                if j != col:
+                    w = (r[0].get(j, 0) - c * v) % q
+                    if w:
+                        r[0][j] = w
+                    else:
+                        r[0].pop(j, None)
+            r[1] = (r[1] - c * rhs) % q
+        pivots.append((col, row, rhs))
+    logs = {}
+    for col, row, rhs in reversed(pivots):
+        total = rhs
+        for j, v in row.items():
+            if j == col:
+                continue
+            if j not in logs:
+                break
+            total -= v * logs[j]
+        else:
+            logs[col] = total % q
+    return logs
+
+
+def _descent(a, y, p, base, logs):
+    """x mod q для каждого q из logs по гладкому y * a^s или None"""
+    prod = math.prod(base)
+    tries = 0
+    while tries < IC_DESCENT_TRIES:
+        s = random.randrange(p - 1)
+        exps = _smooth(y * pow(a, s, p) % p, base, prod)
+        if exps is None:
+            continue
+        tries += 1
+        if all(i in known for known in logs.values() for i, _ in exps):
+            return {q: (sum(e * known[i] for i, e in exps) - s) % q
+                    for q, known in logs.items()}
+    return None
+
+
+def index_calculus(a, y, p, workers=None, bound=None, checkpoint=True, memory=None,
+                   verbose=False):
+    """Метод исчисления индексов: x с a^x = y (mod p) или None.
+
+    Для простых q | p - 1 (q >= IC_MIN_PRIME, в первой степени):
+    факторная база - простые меньше bound (по умолчанию
+    factor_base_bound(p)), соотношения собираются в workers процессах,
+    логарифмы базы находятся по модулю q, затем спуск для y. Остальные
+    множители p - 1 решаются как в pohlig_hellman. checkpoint - файл
+    соотношений (True - relations_path(a, p), None - не сохранять).
+    """
+    n = p - 1
+    a %= p
+    y %= p
+    if a == 0 or y == 0:
+        # 0 не степень a, а спуск для него не найдёт гладких y * a^s
+        return None
+    t = time.perf_counter()
+    factors = factorize(n)
+    big = [q for q, e in factors.items()
+           if e == 1 and q >= IC_MIN_PRIME and pow(a, n // q, p) != 1]
+    if verbose:
+        print(_format_factors(n, factors) + f"  ({time.perf_counter() - t:.3f} с)")
+    x, mod = 0, 1
+    for q, e in factors.items():
+        if q in big:
+            continue
+        found = _prime_power_dlog(a, y, p, n, q, e, workers, memory)
+        if found is None:
+            return None
+        x, mod = _crt_add(x, mod, found[0], q ** found[1])
+    if big:
+        base = primes_below(bound or factor_base_bound(p))
+        if checkpoint is True:
+            checkpoint = relations_path(a, p)
+        relations = _load_relations(checkpoint, a, p, len(base)) if checkpoint else []
+        if verbose:
+            print(f"Факторная база: {len(base)} простых до {base[-1]}, "
+                  f"из файла соотношений: {len(relations)}")
+        need = len(base) + IC_EXTRA_RELATIONS
+        while True:
+            t = time.perf_counter()
+            relations = collect_relations(a, p, base, need, relations, workers, checkpoint, verbose)
+            if verbose:
+                print(f"Сбор соотношений: {time.perf_counter() - t:.3f} с")
+            logs = {}
+            for q in big:
+                t = time.perf_counter()
+                logs[q] = _solve_mod_prime(relations, len(base), q)
+                if verbose:
+                    print(f"  по модулю {q}: известно {len(logs[q])}/{len(base)} логарифмов "
+                          f"({time.perf_counter() - t:.3f} с)")
+            t = time.perf_counter()
+            found = _descent(a, y, p, base, logs)
+            if found is not None:
+                break
+            # логарифмы нужных простых ещё неизвестны - нужно больше соотношений
+            need += len(base) // 2
+        if verbose:
+            print(f"Спуск: {time.perf_counter() - t:.3f} с")
+        for q in big:
+            x, mod = _crt_add(x, mod, found[q], q)
+    return x if pow(a, x, p) == y else None
+
+
+def solve_dlog(a, y, p, method="auto", order=None, interval=None, workers=None, memory=None):
+    """x с a^x = y (mod p) или None.
+
+    method: "bsgs", "disk" (таблица на диске, p < 2^52), "parallel"
+    (parallel_bsgs), "index_calculus", "rho",
+    "pohlig_hellman", "kangaroo" (нужен interval = (lo, hi)) или "auto" - kangaroo при заданном интервале,
+    иначе pohlig_hellman. В подгруппах BSGS, если таблица укладывается
+    в memory байт (по умолчанию DLOG_MEMORY), иначе rho. Для a, кратного
+    p, ответ None при любом методе.
+    """
+    if a % p == 0:
+        return None
+    if method == "auto":
+        method = "kangaroo" if interval is not None else "pohlig_hellman"
+    if method == "pohlig_hellman":
+        return pohlig_hellman(a, y, p, order, workers=workers, memory=memory)
+    if method == "bsgs":
+        return bsgs(a, y, p, order)
+    if method == "disk":
+        return disk_bsgs(a, y, p, order, memory=memory)
+    if method == "parallel":
+        return parallel_bsgs(a, y, p, order, workers)
+    if method == "index_calculus":
+        return index_calculus(a, y, p, workers, memory=memory)
+    if method == "rho":
+        return rho(a, y, p, order, workers)
+    if method == "kangaroo":
+        if interval is None:
+            raise ValueError("Для метода kangaroo нужен интервал (lo, hi)")
+        return kangaroo(a, y, p, *interval, workers=workers)
+    raise ValueError(f"Неизвестный метод {method!r}")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        args = [int(v) for v in sys.argv[2:4]]
+        benchmark_parallel(*args)
+    else:
+        print("python dlog.py bench [биты] [процессы]")
+
+
+if __name__ == "__main__":
+    main()
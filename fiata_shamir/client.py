@@ -4,7 +4,7 @@ import os
 import socket
 import random
 import time
-from common_functions import extended_gcd, fast_pow, ferm_test
+from common_functions import gcd_only, fast_pow, ferm_test
 
 class FiatShamirClient:
     """Клиентская часть протокола Фиата-Шамира"""
@@ -121,7 +121,7 @@ class FiatShamirClient:
         # Выбираем s, взаимно простое с N
         while True:
             self.s = random.randint(2, self.N - 2)
-            if extended_gcd(self.s, self.N)[0] == 1:
+            if gcd_only(self.s, self.N) == 1:
                 break
         
         # Вычисляем v = s^2 mod N
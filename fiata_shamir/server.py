@@ -4,7 +4,7 @@ import os
 import socket
 import threading
 import random
-from common_functions import fast_pow
+from common_functions import ModContext, random_primes
 
 class FiatShamirServer:
     """Серверная часть протокола Фиата-Шамира"""
@@ -13,6 +13,7 @@ class FiatShamirServer:
         self.host = host
         self.port = port
         self.N = 0
+        self.ctx = None  # Контекст модуля N
         self.p = 0
         self.q = 0
         self.users_file = "server_users.json"
@@ -22,28 +23,15 @@ class FiatShamirServer:
         self.load_users()
         self.generate_N(bits=256)  # Генерируем N при запуске
         
-    def generate_N(self, bits=512):
-        """Генерация модуля N = p*q"""
+    def generate_N(self, bits=512, workers=None):
+        """Генерация модуля N = p*q (workers - число процессов поиска простых)"""
         print("СЕРВЕР: Генерация модуля N...")
         
-        import random
-        from common_functions import ferm_test
-        
-        # Генерируем p
-        while True:
-            self.p = random.getrandbits(bits // 2)
-            self.p |= (1 << (bits // 2 - 1)) | 1
-            if ferm_test(self.p):
-                break
-        
-        # Генерируем q
-        while True:
-            self.q = random.getrandbits(bits // 2)
-            self.q |= (1 << (bits // 2 - 1)) | 1
-            if ferm_test(self.q) and self.q != self.p:
-                break
+        # Генерируем p и q
+        self.p, self.q = random_primes(bits // 2, 2, workers)
         
         self.N = self.p * self.q
+        self.ctx = ModContext(self.N)
         
         print(f"СЕРВЕР: p = {self.p}")
         print(f"СЕРВЕР: q = {self.q}")
@@ -291,8 +279,8 @@ class FiatShamirServer:
                     v = session['v']
                     e = session['e_sent']
                     
-                    left_side = (y * y) % self.N
-                    right_side = (x * fast_pow(v, e, self.N)) % self.N
+                    left_side = self.ctx.sqr(y % self.N)
+                    right_side = self.ctx.mul(x, self.ctx.pow(v, e))
                     
                     session['current_round'] += 1
                     
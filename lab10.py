@@ -1,6 +1,7 @@
 import hashlib
 import random
-from lab1 import ferm_test, extended_gcd, fast_pow
+from modarith import inverse_only, fast_pow, fixed_base_pow, multi_pow, batch_inverse
+from param_pool import take
 
 class GOSTSignature:
     def __init__(self):
@@ -12,23 +13,8 @@ class GOSTSignature:
     
     def generate_keys(self):
         """Генерация ключей по ГОСТ Р 34.10-94"""
-        while True:
-            self.q = random.randint(2**15, 2**16)
-            if ferm_test(self.q):
-                break
-        
-        k = 1
-        while True:
-            self.p = k * self.q + 1
-            if ferm_test(self.p):
-                break
-            k += 1
-        
-        while True:
-            h = random.randint(2, self.p - 2)
-            self.a = fast_pow(h, (self.p - 1) // self.q, self.p)
-            if self.a != 1:
-                break
+        # Открытые параметры p, q, a берутся из пула и используются повторно
+        self.p, self.q, self.a = take("schnorr", 16, consume=False)
 
         self.x = random.randint(1, self.q - 1)
         
@@ -43,10 +29,7 @@ class GOSTSignature:
     
     def _mod_inverse(self, a, m):
         """Вычисление обратного элемента по модулю"""
-        gcd, x, _ = extended_gcd(a, m)
-        if gcd != 1:
-            raise ValueError("Обратный элемент не существует")
-        return x % m
+        return inverse_only(a, m)
     
     def sign_file(self, filename, output_filename=None):
         """Подпись файла по ГОСТ Р 34.10-94 (побайтовая подпись хеша)"""
@@ -72,7 +55,7 @@ class GOSTSignature:
                 k = random.randint(1, self.q - 1)
                 
                 # Шаг 3: r = (a^k mod p) mod q
-                r = fast_pow(self.a, k, self.p) % self.q
+                r = fixed_base_pow(self.a, k, self.p) % self.q
                 
                 # Если r = 0, то возвращаемся к шагу 2
                 if r == 0:
@@ -130,6 +113,9 @@ class GOSTSignature:
         valid_count = 0
         total_bytes = len(file_hash)
         
+        # h^(-1) mod q сразу для всех байт хеша
+        h_inv_list = batch_inverse(file_hash, self.q)
+        
         for i, (h_byte, r, s) in enumerate(zip(file_hash, r_list, s_list)):
             # Шаг 2: 0 < r, s < q
             if r <= 0 or r >= self.q:
@@ -143,12 +129,14 @@ class GOSTSignature:
             h = h_byte % self.q
             
             # Шаг 3: u1 = s * h^(-1) mod q, u2 = -r * h^(-1) mod q
-            h_inv = self._mod_inverse(h, self.q)
+            h_inv = h_inv_list[i]
+            if h_inv == 0:
+                raise ValueError("Обратный элемент не существует")
             u1 = (s * h_inv) % self.q
             u2 = (-r * h_inv) % self.q
             
             # Шаг 4: v = (a^u1 * y^u2 mod p) mod q
-            v = (fast_pow(self.a, u1, self.p) * fast_pow(self.y, u2, self.p)) % self.p
+            v = multi_pow([(self.a, u1), (self.y, u2)], self.p)
             v = v % self.q
             
             # Шаг 5: v = r
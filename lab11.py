@@ -1,6 +1,7 @@
 import hashlib
 import random
-from lab1 import ferm_test, extended_gcd, fast_pow
+from modarith import inverse_only, fast_pow, fixed_base_pow, multi_pow, batch_inverse
+from param_pool import take
 
 class DSASignature:
     def __init__(self):
@@ -12,25 +13,8 @@ class DSASignature:
     
     def generate_keys(self):
         """Генерация ключей по FIPS 186 (DSA)"""
-        while True:
-            self.q = random.randint(2**159, 2**160)
-            if ferm_test(self.q):
-                break
-        
-        k = 1
-        while True:
-            self.p = k * self.q + 1
-            if ferm_test(self.p):
-                break
-            k += 1
-        
-        # Находим генератор g
-        h = 2
-        while True:
-            self.g = fast_pow(h, (self.p - 1) // self.q, self.p)
-            if self.g > 1:
-                break
-            h += 1
+        # Открытые параметры домена p, q, g берутся из пула и используются повторно
+        self.p, self.q, self.g = take("schnorr", 160, consume=False)
 
         # Закрытый ключ (0 < x < q)
         self.x = random.randint(1, self.q - 1)
@@ -48,10 +32,7 @@ class DSASignature:
     
     def _mod_inverse(self, a, m):
         """Вычисление обратного элемента по модулю"""
-        gcd, x, _ = extended_gcd(a, m)
-        if gcd != 1:
-            raise ValueError("Обратный элемент не существует")
-        return x % m
+        return inverse_only(a, m)
     
     def sign_file(self, filename, output_filename=None):
         """Подпись файла по алгоритму DSA (FIPS 186) - побайтовая подпись хеша"""
@@ -78,7 +59,7 @@ class DSASignature:
                 k = random.randint(1, self.q - 1)
                 
                 # Шаг 3: Вычисление r = (g^k mod p) mod q
-                r = fast_pow(self.g, k, self.p) % self.q
+                r = fixed_base_pow(self.g, k, self.p) % self.q
                 
                 # Если r = 0, повторяем с другим k
                 if r == 0:
@@ -136,6 +117,9 @@ class DSASignature:
         valid_count = 0
         total_bytes = len(file_hash)
         
+        # Шаг 3: w = s^(-1) mod q сразу для всех байт
+        w_list = batch_inverse(s_list, self.q)
+        
         for i, (h_byte, r, s) in enumerate(zip(file_hash, r_list, s_list)):
             if r <= 0 or r >= self.q:
                 print(f"Ошибка: r[{i}] = {r} не удовлетворяет условию 0 < r < q")
@@ -147,8 +131,7 @@ class DSASignature:
             
             h = int(h_byte) % self.q
             
-            # Шаг 3: Вычисление w = s^(-1) mod q
-            w = self._mod_inverse(s, self.q)
+            w = w_list[i]
             
             # Шаг 4: Вычисление u1 = (h * w) mod q
             u1 = (h * w) % self.q
@@ -157,7 +140,7 @@ class DSASignature:
             u2 = (r * w) % self.q
             
             # Шаг 6: Вычисление v = (g^u1 * y^u2 mod p) mod q
-            v = (fast_pow(self.g, u1, self.p) * fast_pow(self.y, u2, self.p)) % self.p
+            v = multi_pow([(self.g, u1), (self.y, u2)], self.p)
             v = v % self.q
             
             # Шаг 7: Проверка v = r
@@ -1,6 +1,7 @@
 import random
 from pathlib import Path
-from lab1 import ferm_test, extended_gcd, fast_pow
+from modarith import ferm_test, gcd_only, inverse_only, pow_many
+from param_pool import take
 
 class ScalableMentalPoker:
     def __init__(self):
@@ -32,10 +33,7 @@ class ScalableMentalPoker:
         print(f"Нужно карт: {num_players * 2} игрокам + 5 на стол = {num_players * 2 + 5}")
         print(f"Останется карт в колоде: {len(self.cards) - (num_players * 2 + 5)}")
         
-        while True:
-            self.p = random.randint(2**127, 2**128)
-            if ferm_test(self.p):
-                break
+        self.p = take("prime", 128)
         
         self.players = []
         print(f"\nГенерация ключей для {num_players} игроков...")
@@ -44,11 +42,10 @@ class ScalableMentalPoker:
             # Генерируем секретный ключ c и вычисляем открытый ключ d
             while True:
                 c = random.randint(2, self.p - 2)
-                if extended_gcd(c, self.p - 1)[0] == 1:
+                if gcd_only(c, self.p - 1) == 1:
                     break
             
-            gcd, d, _ = extended_gcd(c, self.p - 1)
-            d = d % (self.p - 1)
+            d = inverse_only(c, self.p - 1)
             
             self.players.append({
                 'id': i,
@@ -67,13 +64,7 @@ class ScalableMentalPoker:
     def encrypt_deck_by_player(self, player_id, deck):
         """Игрок шифрует всю колоду своим ключом"""
         player = self.players[player_id]
-        encrypted_deck = []
-        
-        for card in deck:
-            encrypted = fast_pow(card, player['encrypt_key_e'], self.p)
-            encrypted_deck.append(encrypted)
-        
-        return encrypted_deck
+        return pow_many(deck, player['encrypt_key_e'], self.p)
     
     def mental_poker_protocol_for_n_players(self):
         """Протокол Ментального покера для N игроков"""
@@ -130,13 +121,8 @@ class ScalableMentalPoker:
         
         for player_id in reversed(range(self.num_players)):
             player = self.players[player_id]
-            new_partially_decrypted = []
-            
-            for encrypted_card in partially_decrypted_table:
-                decrypted = fast_pow(encrypted_card, player['decrypt_key_d'], self.p)
-                new_partially_decrypted.append(decrypted)
-            
-            partially_decrypted_table = new_partially_decrypted
+            partially_decrypted_table = pow_many(partially_decrypted_table,
+                                                 player['decrypt_key_d'], self.p)
             print(f"   Игрок {player_id+1} дешифровал карты на столе")
         
         table_cards = []
@@ -161,22 +147,15 @@ class ScalableMentalPoker:
                     continue  # Пропускаем самого игрока - он дешифрует последним
                     
                 other_player = self.players[other_player_id]
-                new_partially_decrypted = []
-                
-                for encrypted_card in partially_decrypted:
-                    decrypted = fast_pow(encrypted_card, other_player['decrypt_key_d'], self.p)
-                    new_partially_decrypted.append(decrypted)
-                
-                partially_decrypted = new_partially_decrypted
+                partially_decrypted = pow_many(partially_decrypted,
+                                               other_player['decrypt_key_d'], self.p)
                 print(f"   Игрок {other_player_id+1} дешифровал карты Игрока {player_id+1}")
             
             # Сохраняем частично дешифрованные карты
             player['partially_decrypted_cards'] = partially_decrypted
             
             final_decrypted = []
-            for encrypted_card in partially_decrypted:
-                decrypted = fast_pow(encrypted_card, player['decrypt_key_d'], self.p)
-                
+            for decrypted in pow_many(partially_decrypted, player['decrypt_key_d'], self.p):
                 card_value = decrypted % 52 + 2
                 if card_value > 53:
                     card_value = 53
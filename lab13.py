@@ -1,15 +1,20 @@
 import hashlib
 import random
-from lab1 import ferm_test, extended_gcd, fast_pow
+from modarith import gcd_only, inverse_only, ModContext
+from param_pool import level, take
+from rsa_keys import RSAPrivateKey, fits_exponent, generate_rsa_primes
 
 class BlindSignatureVoting:
     def __init__(self):
         self.p = 0
         self.q = 0
         self.n = 0
+        self.ctx = None  # контекст модуля n
         self.phi = 0
         self.d = 0  # закрытый ключ сервера (для подписи)
         self.c = 0  # открытый ключ сервера (для проверки)
+        self.extra_primes = []  # дополнительные простые множители n (многопростой RSA)
+        self.key = None  # закрытый ключ d с p, q для подписи через КТО
         
         # Клиентские параметры
         self.client_n = 0  # бюллетень клиента
@@ -22,45 +27,61 @@ class BlindSignatureVoting:
 
         self.steps = []
     
-    def generate_server_keys(self):
-        """Генерация ключей сервера"""
-        # Генерируем простые числа p и q
-        while True:
-            self.p = random.randint(2**511, 2**512)  # 512-битные простые
-            if ferm_test(self.p):
-                break
-        
-        while True:
-            self.q = random.randint(2**511, 2**512)
-            if ferm_test(self.q) and self.q != self.p:
-                break
+    def generate_server_keys(self, workers=None, nprimes=2, public_exponent=None):
+        """Генерация ключей сервера.
+
+        workers - число процессов поиска простых, nprimes - число простых
+        в 1024-битном модуле n (больше двух - многопростой RSA),
+        public_exponent - фиксированный открытый ключ c (например, 65537),
+        с которым проверка бюллетеня стоит около 17 умножений.
+        """
+        self.extra_primes = []
+        # Генерируем простые числа p и q: 512-битные из пула или поиском
+        if nprimes == 2 and level("prime", 512) >= 2:
+            self.p = take("prime", 512)
+            while not fits_exponent((self.p,), public_exponent):
+                self.p = take("prime", 512)
+            self.q = take("prime", 512)
+            while self.q == self.p or not fits_exponent((self.q,), public_exponent):
+                self.q = take("prime", 512)
+        else:
+            self.p, self.q, *self.extra_primes = generate_rsa_primes(
+                1024, nprimes, workers, public_exponent)
         
         # Вычисляем параметры
         self.n = self.p * self.q
         self.phi = (self.p - 1) * (self.q - 1)
+        for r in self.extra_primes:
+            self.n *= r
+            self.phi *= r - 1
+        self.ctx = ModContext(self.n)
         
         # Выбираем c (открытый ключ)
-        while True:
-            self.c = random.randint(2, self.phi - 1)
-            if extended_gcd(self.c, self.phi)[0] == 1:
-                break
+        if public_exponent:
+            self.c = public_exponent
+        else:
+            while True:
+                self.c = random.randint(2, self.phi - 1)
+                if gcd_only(self.c, self.phi) == 1:
+                    break
         
         # Вычисляем d (закрытый ключ): c * d ≡ 1 mod φ
-        gcd, x, _ = extended_gcd(self.c, self.phi)
-        self.d = x % self.phi
-        if self.d < 0:
-            self.d += self.phi
+        self.d = inverse_only(self.c, self.phi)
+        self.key = RSAPrivateKey(self.n, self.d, self.p, self.q, *self.extra_primes)
         
         self.steps.append("=== СЕРВЕР: Ключи сгенерированы ===")
         self.steps.append(f"p = {self.p}")
         self.steps.append(f"q = {self.q}")
-        self.steps.append(f"n = p * q = {self.n}")
-        self.steps.append(f"φ(n) = (p-1)*(q-1) = {self.phi}")
+        names = ["p", "q"] + [f"r{i}" for i in range(1, len(self.extra_primes) + 1)]
+        for name, r in zip(names[2:], self.extra_primes):
+            self.steps.append(f"{name} = {r}")
+        self.steps.append(f"n = {' * '.join(names)} = {self.n}")
+        self.steps.append(f"φ(n) = {'*'.join(f'({name}-1)' for name in names)} = {self.phi}")
         self.steps.append(f"Открытый ключ (c) = {self.c}")
         self.steps.append(f"Закрытый ключ (d) = {self.d}")
         self.steps.append(f"Проверка: c * d mod φ = {self.c * self.d % self.phi} (должно быть 1)")
         
-        print("\n".join(self.steps[-7:]))
+        print("\n".join(self.steps[-(7 + len(self.extra_primes)):]))
         return True
     
     def client_create_ballot(self, vote_choice, rnd_number=None):
@@ -102,12 +123,12 @@ class BlindSignatureVoting:
         # Генерируем r такой, что gcd(r, n) = 1
         while True:
             self.client_r = random.randint(2, self.n - 1)
-            if extended_gcd(self.client_r, self.n)[0] == 1:
+            if gcd_only(self.client_r, self.n) == 1:
                 break
         
         self.steps.append("\n=== КЛИЕНТ: Генерация ослепляющего множителя ===")
         self.steps.append(f"r = {self.client_r}")
-        self.steps.append(f"Проверка: gcd(r, n) = {extended_gcd(self.client_r, self.n)[0]} (должно быть 1)")
+        self.steps.append(f"Проверка: gcd(r, n) = {gcd_only(self.client_r, self.n)} (должно быть 1)")
         
         print("\n".join(self.steps[-3:]))
         return True
@@ -134,8 +155,8 @@ class BlindSignatureVoting:
     def client_blind_hash(self):
         """Клиент ослепляет хеш"""
         # Вычисляем _h = h * (r^c) mod n
-        r_pow_c = fast_pow(self.client_r, self.c, self.n)
-        self.client_blinded_h = (self.client_h * r_pow_c) % self.n
+        r_pow_c = self.ctx.pow(self.client_r, self.c)
+        self.client_blinded_h = self.ctx.mul(self.client_h, r_pow_c)
         
         self.steps.append("\n=== КЛИЕНТ: Ослепление хеша ===")
         self.steps.append(f"h = {self.client_h}")
@@ -154,7 +175,7 @@ class BlindSignatureVoting:
             return 0
         
         # Сервер вычисляет _s = _h ^ d mod n
-        server_blinded_signature = fast_pow(self.client_blinded_h, self.d, self.n)
+        server_blinded_signature = self.key.pow(self.client_blinded_h)
         
         self.steps.append("\n=== СЕРВЕР: Подпись ослепленного хеша ===")
         self.steps.append(f"_h (от клиента) = {self.client_blinded_h}")
@@ -167,13 +188,10 @@ class BlindSignatureVoting:
     def client_unblind_signature(self, server_blinded_signature):
         """Клиент снимает ослепление с подписи"""
         # Находим обратный элемент r_inv: r * r_inv ≡ 1 mod n
-        gcd, r_inv, _ = extended_gcd(self.client_r, self.n)
-        r_inv = r_inv % self.n
-        if r_inv < 0:
-            r_inv += self.n
+        r_inv = self.ctx.inverse(self.client_r)
         
         # Вычисляем s = _s * r_inv mod n
-        self.client_s = (server_blinded_signature * r_inv) % self.n
+        self.client_s = self.ctx.mul(server_blinded_signature, r_inv)
         
         self.steps.append("\n=== КЛИЕНТ: Снятие ослепления ===")
         self.steps.append(f"_s (от сервера) = {server_blinded_signature}")
@@ -181,7 +199,7 @@ class BlindSignatureVoting:
         self.steps.append(f"r_inv mod n = {r_inv}")
         self.steps.append(f"Проверка: r * r_inv mod n = {self.client_r * r_inv % self.n} (должно быть 1)")
         self.steps.append(f"s = _s * r_inv mod n = {self.client_s}")
-        self.steps.append(f"Ожидаемое: h^d mod n = {fast_pow(self.client_h, self.d, self.n)}")
+        self.steps.append(f"Ожидаемое: h^d mod n = {self.ctx.pow(self.client_h, self.d)}")
         
         print("\n".join(self.steps[-7:]))
         return True
@@ -195,7 +213,7 @@ class BlindSignatureVoting:
         h = int(hash_hex, 16) % self.n
         
         # Проверяем: SHA3(n) = s^c mod n
-        s_pow_c = fast_pow(self.client_s, self.c, self.n)
+        s_pow_c = self.ctx.pow(self.client_s, self.c)
         
         self.steps.append("\n=== СЕРВЕР: Проверка подписи ===")
         self.steps.append(f"n (бюллетень) = {self.client_n}")
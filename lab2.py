@@ -1,8 +1,22 @@
+import os
 import random
 import math
-from lab1 import fast_pow, ferm_test
+import tempfile
+from modarith import fast_pow, ferm_test
+from primes import random_prime
+from dlog import bsgs, disk_bsgs, index_calculus, pohlig_hellman, solve_dlog
+import vecmod
+
+# Методы для main: shanks - shanks_method, остальные - dlog.solve_dlog
+METHODS = ("shanks", "auto", "bsgs", "disk", "parallel", "rho", "kangaroo", "pohlig_hellman",
+           "index_calculus")
+# Методы только для p < 2^52 (vecmod.supports_wide)
+WIDE_METHODS = ("disk", "parallel")
 
 def shanks_method(a, y, p):
+    if vecmod.supports(p):
+        # таблицы в numpy, без вывода списков A и B
+        return bsgs(a, y, p, verbose=True)
     k = m = int(p ** 0.5) + 1
     print(k, m)
     A = []
@@ -31,6 +45,36 @@ def shanks_method(a, y, p):
             print(value_to_index[value], i + 1)
             x = (i + 1) * m - value_to_index[value]
             return x
+
+def ask_method(p):
+    while True:
+        method = input(f"Метод ({', '.join(METHODS)}; Enter - shanks): ").strip().lower()
+        if not method:
+            return "shanks"
+        if method in WIDE_METHODS and not vecmod.supports_wide(p):
+            print(f"Метод {method} работает только при p < 2^52 и установленном numpy")
+        elif method in METHODS:
+            return method
+        else:
+            print("Неизвестный метод")
+
+def solve(a, y, p, method, persist=True):
+    """persist - оставлять файлы с промежуточными данными для повторного запуска"""
+    if method == "shanks":
+        return shanks_method(a, y, p)
+    if method == "pohlig_hellman":
+        # с разложением p - 1 и временем по подгруппам
+        return pohlig_hellman(a, y, p, verbose=True)
+    if method == "index_calculus":
+        # с ходом сбора соотношений; прерванный сбор продолжится из файла
+        return index_calculus(a, y, p, checkpoint=True if persist else None, verbose=True)
+    if method == "disk" and not persist:
+        # таблица во временном каталоге, удаляется вместе с ним
+        with tempfile.TemporaryDirectory() as tmp:
+            return disk_bsgs(a, y, p, path=os.path.join(tmp, "table.tbl"))
+    # кенгуру ищет x во всём диапазоне [0, p - 2]
+    interval = (0, p - 2) if method == "kangaroo" else None
+    return solve_dlog(a, y, p, method, interval=interval)
              
 def main():
     print("Ввести числа вручную? (y/n): ")
@@ -59,9 +103,10 @@ def main():
                 break
             print("y должно быть в диапазоне (0, p)")
         
+        method = ask_method(p)
         print(f"\nРешаем: {y} ≡ {a}^x mod {p}")
         
-        x = shanks_method(a, y, p)
+        x = solve(a, y, p, method)
         
         if x is not None:
             print(f"\nНайденное решение: x = {x}")
@@ -76,17 +121,15 @@ def main():
     
     elif ans == 'n':
         a = random.randint(2, 100000)
-        while True:
-            p = random.randint(1000001, 1000000000)
-            if ferm_test(p):
-                break
+        p = random_prime(lo=1000001, hi=1000000000)
         
         x_true = random.randint(1, p - 2)
         y = fast_pow(a, x_true, p)
         
         print(f"y = {y}, a = {a}, p = {p}")
         
-        x_calculated = shanks_method(a, y, p)
+        # p каждый раз новое - файлы для повторного запуска не нужны
+        x_calculated = solve(a, y, p, ask_method(p), persist=False)
         print(f"\nВычисленный x = {x_calculated}")
         print(f"Истинный x = {x_true}")
         print(f"\n{y} = {a} ^ {x_calculated} mod {p}")
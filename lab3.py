@@ -1,9 +1,11 @@
 import random
-from lab1 import fast_pow, ferm_test
+from modarith import fast_pow, ferm_test, fixed_base_pow
+from primes import random_safe_prime
+from dlog import DlogSolver
 
 def diffi(Xa, Xb, p, g):
-    Ya = fast_pow(g, Xa, p)
-    Yb = fast_pow(g, Xb, p)
+    Ya = fixed_base_pow(g, Xa, p)
+    Yb = fixed_base_pow(g, Xb, p)
 
     print(f"\nYa = {g} ^ {Xa} mod {p} = {Ya}")
     print(f"\nYb = {g} ^ {Xb} mod {p} = {Yb}")
@@ -19,6 +21,24 @@ def diffi(Xa, Xb, p, g):
     else:
         print("\nКлючи не совпадают")
 
+    return Ya, Yb
+
+
+def crack_keys(p, g, public_keys):
+    """Восстановление секретных ключей по открытым: одна таблица на все Y"""
+    solver = DlogSolver(g, p, targets=len(public_keys)).build()
+    secrets = solver.solve_many(public_keys)
+    for Y, X in zip(public_keys, secrets):
+        print(f"\nY = {Y}: X = {X}, проверка {g} ^ {X} mod {p} = {fast_pow(g, X, p)}")
+    return secrets
+
+
+def ask_crack(p, g, public_keys):
+    print("\nВосстановить секретные ключи по открытым? (y/n): ")
+    if input().strip().lower() == 'y':
+        Xa, Xb = crack_keys(p, g, public_keys)
+        print(f"\nОбщий ключ по найденным ключам: {fast_pow(public_keys[1], Xa, p)}")
+
 
 def main():
     print("Ввести числа вручную? (y/n): ")
@@ -64,23 +84,13 @@ def main():
             else:
                 print("Xb должно быть в диапазоне [1, p)")
         
-        diffi(Xa, Xb, p, g)
+        Ya, Yb = diffi(Xa, Xb, p, g)
+        ask_crack(p, g, [Ya, Yb])
     
     elif ans == 'n':
         # Автоматическая генерация q и p = 2*q + 1 (оба простые)
-        while True:
-            q = random.randint(1000000, 1000000000)
-            if ferm_test(q):
-                p_temp = 2 * q + 1
-                if ferm_test(p_temp):
-                    p = p_temp
-                    break
-        
-        # Генерация g - первообразного корня по модулю p
-        while True:
-            g = random.randint(2, p - 2)
-            if fast_pow(g, q, p) != 1:  # проверка условия g^q mod p != 1
-                break
+        # q и p = 2*q + 1 простые, g - первообразный корень по модулю p
+        p, q, g = random_safe_prime(lo=1000000, hi=1000000000)
         
         # Генерация секретных ключей
         Xa = random.randint(1, p - 1)
@@ -94,7 +104,8 @@ def main():
         print(f"Xb = {Xb} (секретный ключ Боба)")
         print()
         
-        diffi(Xa, Xb, p, g)
+        Ya, Yb = diffi(Xa, Xb, p, g)
+        ask_crack(p, g, [Ya, Yb])
     
     else:
         print("Неверный ввод")
@@ -1,7 +1,9 @@
 import os
 import random
 import struct
-from lab1 import fast_pow, ferm_test as ferm, extended_gcd as Evkl
+from modarith import fast_pow, pow_many, ferm_test as ferm, extended_gcd as Evkl
+from primes import random_prime
+import vecmod
 
 def Shamir(p, m, Ca, Da, Cb, Db):
     x1 = fast_pow(m, Ca, p)
@@ -82,10 +84,7 @@ def shamir_encrypt_file(input_file, p=None, Ca=None, Cb=None):
                 print("Db должно быть взаимно обратным с Cb")
 
     elif ans == 'n':
-        while True:
-            p = random.randint(1000000, 100000000)
-            if ferm(p):
-                break
+        p = random_prime(lo=1000000, hi=100000000)
         print(f"p = {p}")
         
         while True:
@@ -113,7 +112,18 @@ def shamir_encrypt_file(input_file, p=None, Ca=None, Cb=None):
     with open(input_file, 'rb') as f:
         file_data = f.read()
     
-    encrypted_blocks = []
+    if vecmod.supports(p):
+        # все блоки файла сразу, массивами numpy
+        m = vecmod.blocks_from_bytes(file_data, 3)
+        if (m >= p).any():
+            raise ValueError(f"Блок данных слишком большой для p={p}")
+        X1 = vecmod.pow_array(m, Ca, p)
+        X2 = vecmod.pow_array(X1, Cb, p)
+        X3 = vecmod.pow_array(X2, Da, p)
+        encrypted_blocks = list(zip(X1.tolist(), X2.tolist(), X3.tolist()))
+        return p, Ca, Cb, Da, Db, encrypted_blocks, len(file_data)
+    
+    blocks = []
     for i in range(0, len(file_data), 3):
         block = file_data[i:i+3]
         if len(block) < 3:
@@ -121,20 +131,22 @@ def shamir_encrypt_file(input_file, p=None, Ca=None, Cb=None):
         m = int.from_bytes(block, byteorder='big')
         if m >= p:
             raise ValueError(f"Блок данных слишком большой для p={p}")
-        
-        X1 = fast_pow(m, Ca, p)
-        X2 = fast_pow(X1, Cb, p)
-        X3 = fast_pow(X2, Da, p)
-        encrypted_blocks.append((X1, X2, X3))
+        blocks.append(m)
+    
+    X1 = pow_many(blocks, Ca, p)
+    X2 = pow_many(X1, Cb, p)
+    X3 = pow_many(X2, Da, p)
+    encrypted_blocks = list(zip(X1, X2, X3))
     
     return p, Ca, Cb, Da, Db, encrypted_blocks, len(file_data)
 
 def shamir_decrypt_file(encrypted_blocks, p, Db, original_size):
-    decrypted_data = b''
-    for X1, X2, X3 in encrypted_blocks:
-        X4 = fast_pow(X3, Db, p)
-        block_data = X4.to_bytes(3, byteorder='big')
-        decrypted_data += block_data
+    if vecmod.supports(p) and encrypted_blocks:
+        X4 = vecmod.pow_array([X3 for _, _, X3 in encrypted_blocks], Db, p)
+        return vecmod.blocks_to_bytes(X4, 3)[:original_size]
+    
+    X4 = pow_many([X3 for _, _, X3 in encrypted_blocks], Db, p)
+    decrypted_data = b''.join(x.to_bytes(3, byteorder='big') for x in X4)
     return decrypted_data[:original_size]
 
 def save_encrypted_binary(filename, p, Ca, Cb, Da, Db, encrypted_blocks, original_size):
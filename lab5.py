@@ -2,7 +2,9 @@ import os
 import random
 import struct
 from typing import List, Tuple
-from lab1 import ferm_test, fast_pow
+from modarith import ferm_test, fast_pow, fixed_base_pow
+from primes import random_prime
+import vecmod
 
 def choose_block_size_for_p(p: int) -> int:  
     if p <= 2:
@@ -14,8 +16,9 @@ def choose_block_size_for_p(p: int) -> int:
 
 def elgamal_encrypt_block(m: int, p: int, g: int, y: int) -> Tuple[int,int]:
     k = random.randint(2, p - 2)
-    a = fast_pow(g, k, p)
-    yk = fast_pow(y, k, p)
+    # g и y одни на весь файл - степени берутся из таблиц
+    a = fixed_base_pow(g, k, p)
+    yk = fixed_base_pow(y, k, p)
     b = (m * yk) % p
     return a, b
 
@@ -24,6 +27,18 @@ def elgamal_decrypt_block(a: int, b: int, p: int, x: int) -> int:
     m = (b * ax_inv) % p
     return m
 
+def elgamal_encrypt_blocks(blocks, p: int, g: int, y: int) -> List[Tuple[int,int]]:
+    # Все блоки сразу: свой случайный k на каждый блок, степени считаются массивами
+    ks = vecmod.randint_array(2, p - 2, len(blocks))
+    a = vecmod.pow_array(g, ks, p)
+    yk = vecmod.pow_array(y, ks, p)
+    b = vecmod.mul_array(blocks, yk, p)
+    return list(zip(a.tolist(), b.tolist()))
+
+def elgamal_decrypt_blocks(pairs: List[Tuple[int,int]], p: int, x: int):
+    ax_inv = vecmod.pow_array([a for a, _ in pairs], p - 1 - x, p)
+    return vecmod.mul_array([b for _, b in pairs], ax_inv, p)
+
 def save_encrypted_file_bin(filename: str, p: int, g: int, y: int, x_or_0: int,
                             encrypted_pairs: List[Tuple[int,int]], original_size: int, block_size: int):
     with open(filename, 'wb') as f:
@@ -75,10 +90,7 @@ def elgamal_file_full_cycle():
             if 1 < x < p:
                 break
     else:
-        while True:
-            p = random.randint(1000000, 100000000)
-            if ferm_test(p):
-                break
+        p = random_prime(lo=1000000, hi=100000000)
 
         while True:
             g = random.randint(2, p - 2)
@@ -95,16 +107,24 @@ def elgamal_file_full_cycle():
     block_size = choose_block_size_for_p(p)
     print(f"Использовать блоки по {block_size} байт (каждый блок < p).")
 
-    encrypted_pairs = []
-    for i in range(0, len(data), block_size):
-        block = data[i:i+block_size]
-        if len(block) < block_size:
-            block = block + b'\x00' * (block_size - len(block))
-        m = int.from_bytes(block, byteorder='big')
-        if m >= p:
+    if vecmod.supports(p):
+        # все блоки файла сразу, массивами numpy
+        blocks = vecmod.blocks_from_bytes(data, block_size)
+        if (blocks >= p).any():
+            m = int(blocks[blocks >= p][0])
             raise ValueError(f"Момент: числовой блок m = {m} не меньше p = {p}. Увеличьте p или уменьшите block_size.")
-        a, b = elgamal_encrypt_block(m, p, g, y)
-        encrypted_pairs.append((a, b))
+        encrypted_pairs = elgamal_encrypt_blocks(blocks, p, g, y)
+    else:
+        encrypted_pairs = []
+        for i in range(0, len(data), block_size):
+            block = data[i:i+block_size]
+            if len(block) < block_size:
+                block = block + b'\x00' * (block_size - len(block))
+            m = int.from_bytes(block, byteorder='big')
+            if m >= p:
+                raise ValueError(f"Момент: числовой блок m = {m} не меньше p = {p}. Увеличьте p или уменьшите block_size.")
+            a, b = elgamal_encrypt_block(m, p, g, y)
+            encrypted_pairs.append((a, b))
 
     enc_path = "eg_enc" + input_file
     x_or_0 = x if x != 0 else 0
@@ -122,10 +142,13 @@ def elgamal_file_full_cycle():
         x_to_use = int(input("Введите приватный ключ x (для расшифровки): ").strip())
 
     decrypted = bytearray()
-    for a,b in pairs_loaded:
-        m = elgamal_decrypt_block(a, b, p2, x_to_use)
-        block_bytes = m.to_bytes(block_size2, byteorder='big')
-        decrypted.extend(block_bytes)
+    if vecmod.supports(p2) and pairs_loaded:
+        decrypted.extend(vecmod.blocks_to_bytes(elgamal_decrypt_blocks(pairs_loaded, p2, x_to_use), block_size2))
+    else:
+        for a,b in pairs_loaded:
+            m = elgamal_decrypt_block(a, b, p2, x_to_use)
+            block_bytes = m.to_bytes(block_size2, byteorder='big')
+            decrypted.extend(block_bytes)
 
     decrypted = bytes(decrypted[:original_size2])
 
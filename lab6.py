@@ -2,7 +2,9 @@ import os
 import random
 import struct
 from typing import List, Tuple
-from lab1 import ferm_test, fast_pow, extended_gcd
+from modarith import ferm_test, extended_gcd, gcd_only, inverse_only, pow_many
+from primes import random_safe_prime
+from rsa_keys import RSAPrivateKey, fits_exponent, generate_rsa_primes
 
 def choose_block_size_for_N(N: int) -> int:
     if N <= 2:
@@ -13,7 +15,8 @@ def choose_block_size_for_N(N: int) -> int:
     return k
 
 def save_encrypted_file_bin(filename: str, N: int, d: int, c_or_0: int,
-                            encrypted_vals: List[int], original_size: int, block_size: int):
+                            encrypted_vals: List[int], original_size: int, block_size: int,
+                            primes: Tuple[int, ...] = None):
     reserved = 0
     with open(filename, 'wb') as f:
         header = struct.pack('<6Q', N, d, c_or_0, original_size, block_size, reserved)
@@ -21,6 +24,9 @@ def save_encrypted_file_bin(filename: str, N: int, d: int, c_or_0: int,
         f.write(struct.pack('<I', len(encrypted_vals)))
         for val in encrypted_vals:
             f.write(struct.pack('<Q', val))
+        # Необязательный хвост: простые множители N для расшифровки через КТО
+        if primes:
+            f.write(struct.pack(f'<{len(primes)}Q', *primes))
 
 def load_encrypted_file_bin(filename: str):
     with open(filename, 'rb') as f:
@@ -39,17 +45,13 @@ def load_encrypted_file_bin(filename: str):
                 raise ValueError("Неверный/повреждённый зашифрованный файл (values).")
             v = struct.unpack('<Q', val_bytes)[0]
             vals.append(v)
-    return N, d, c_or_0, original_size, block_size, vals
+        tail = f.read()
+        primes = None
+        if tail and len(tail) % 8 == 0:
+            primes = struct.unpack(f'<{len(tail) // 8}Q', tail)
+    return N, d, c_or_0, original_size, block_size, vals, primes
 
-def rsa_encrypt_block(m: int, N: int, d: int) -> int:
-    # e = m^d mod N   (по вашей нотации)
-    return fast_pow(m, d, N)
-
-def rsa_decrypt_block(e_val: int, N: int, c: int) -> int:
-    # m = e^c mod N
-    return fast_pow(e_val, c, N)
-
-def rsa_file_full_cycle():
+def rsa_file_full_cycle(nprimes: int = 2, public_exponent: int = None):
     input_file = input("Введите путь к файлу для шифрования (любой формат): ").strip()
     if not os.path.exists(input_file):
         print("Файл не найден.")
@@ -81,26 +83,36 @@ def rsa_file_full_cycle():
             print("Внимание: введённый d не взаимно прост с phi; необходимо выбрать другое d.")
             return
         c = gcd_res[1] % phi
+        factors = (p, q)
         x_saved = 0
     else:
         
-        while True:
-            q = random.randint(1000000, 1000000000)
-            if ferm_test(q):
-                p_temp = 2 * q + 1
-                if ferm_test(p_temp):
-                    p = p_temp
+        # nprimes - число простых множителей N (многопростой RSA при nprimes > 2)
+        # public_exponent - фиксированный открытый ключ d (например, 65537)
+        if nprimes == 2:
+            while True:
+                p, q, _ = random_safe_prime(lo=1000000, hi=1000000000)
+                factors = (p, q)
+                if fits_exponent(factors, public_exponent):
                     break
+        else:
+            # N должен помещаться в 64-битное поле заголовка
+            factors = tuple(generate_rsa_primes(60, nprimes, public_exponent=public_exponent))
         
-        N = p * q
-        phi = (p - 1) * (q - 1)
-        while True:
-            d = random.randint(2, phi - 1)
-            if extended_gcd(d, phi)[0] == 1:
-                break
-        g, xinv, y = extended_gcd(d, phi)
-        c = xinv % phi
-        print(f"Сгенерировано: p={p}, q={q}, N={N}, d={d}, c(приватный)={c}")
+        N = 1
+        phi = 1
+        for r in factors:
+            N *= r
+            phi *= r - 1
+        if public_exponent:
+            d = public_exponent
+        else:
+            while True:
+                d = random.randint(2, phi - 1)
+                if gcd_only(d, phi) == 1:
+                    break
+        c = inverse_only(d, phi)
+        print(f"Сгенерировано: простые={factors}, N={N}, d={d}, c(приватный)={c}")
         x_saved = c
 
     print(f"Будем работать с N = {N}. Проверка размера блоков ...")
@@ -111,7 +123,7 @@ def rsa_file_full_cycle():
     block_size = choose_block_size_for_N(N)
     print(f"Используется block_size = {block_size} байт (каждый блок < N).")
 
-    encrypted_values = []
+    blocks = []
     for i in range(0, len(data), block_size):
         block = data[i:i+block_size]
         if len(block) < block_size:
@@ -119,14 +131,17 @@ def rsa_file_full_cycle():
         m = int.from_bytes(block, byteorder='big')
         if m >= N:
             raise ValueError(f"Числовой блок m = {m} >= N = {N}. Увеличьте N или уменьшите block_size.")
-        e_val = rsa_encrypt_block(m, N, d)
-        encrypted_values.append(e_val)
+        blocks.append(m)
+    # e = m^d mod N для всех блоков сразу: показатель d общий
+    encrypted_values = pow_many(blocks, d, N)
 
     enc_path = "rsa_enc_" + input_file
-    save_encrypted_file_bin(enc_path, N, d, x_saved, encrypted_values, original_size, block_size)
+    # простые множители сохраняются только вместе с закрытым ключом
+    primes = factors if x_saved else None
+    save_encrypted_file_bin(enc_path, N, d, x_saved, encrypted_values, original_size, block_size, primes)
     print(f"Зашифрованный файл сохранён: {enc_path}")
 
-    N2, d2, c_or_0, original_size2, block_size2, vals_loaded = load_encrypted_file_bin(enc_path)
+    N2, d2, c_or_0, original_size2, block_size2, vals_loaded, primes2 = load_encrypted_file_bin(enc_path)
     if N2 != N:
         print("Внимание: N в загруженном файле не совпадает с ожидаемым.")
     if c_or_0 != 0:
@@ -135,9 +150,9 @@ def rsa_file_full_cycle():
     else:
         c_to_use = int(input("Введите приватный ключ c для расшифровки: ").strip())
 
+    key = RSAPrivateKey(N2, c_to_use, *(primes2 or ()))
     decrypted = bytearray()
-    for e_val in vals_loaded:
-        m = rsa_decrypt_block(e_val, N2, c_to_use)
+    for m in key.pow_many(vals_loaded):
         block_bytes = m.to_bytes(block_size2, byteorder='big')
         decrypted.extend(block_bytes)
 
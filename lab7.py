@@ -3,7 +3,8 @@ import random
 import struct
 import hashlib
 from typing import List, Tuple
-from lab1 import ferm_test, fast_pow, extended_gcd
+from modarith import ferm_test, fast_pow, extended_gcd
+from primes import random_safe_prime
 
 def derive_key_bytes_from_shared(shared_int: int, length: int) -> bytes:
     if shared_int == 0:
@@ -76,19 +77,8 @@ def dh_generate_params_or_use_input():
                 print("Xb должно быть в диапазоне [1, p)")
         
     else:
-        while True:
-            q = random.randint(1000000, 1000000000)
-            if ferm_test(q):
-                p_temp = 2 * q + 1
-                if ferm_test(p_temp):
-                    p = p_temp
-                    break
-        
-        # Генерация g - первообразного корня по модулю p
-        while True:
-            g = random.randint(2, p - 2)
-            if fast_pow(g, q, p) != 1:  # проверка условия g^q mod p != 1
-                break
+        # q и p = 2*q + 1 простые, g - первообразный корень по модулю p
+        p, q, g = random_safe_prime(lo=1000000, hi=1000000000)
         
         # Генерация секретных ключей
         Xa = random.randint(1, p - 1)
@@ -1,6 +1,8 @@
 import hashlib
 import random
-from lab1 import ferm_test, extended_gcd, fast_pow
+from modarith import gcd_only, inverse_only, fast_pow
+from primes import random_prime
+from rsa_keys import RSAPrivateKey, fits_exponent, generate_rsa_primes
 
 class RSASignature:
     def __init__(self):
@@ -10,36 +12,57 @@ class RSASignature:
         self.phi = 0
         self.d = 0  # открытый ключ
         self.c = 0  # закрытый ключ
+        self.extra_primes = []  # дополнительные простые множители N (многопростой RSA)
+        self.key = None  # закрытый ключ с p, q для подписи через КТО
     
-    def generate_keys(self):
-        """Генерация ключей RSA"""
-        # Генерируем простые числа в диапазоне [32500, 45000]
-        while(True):
-            self.p = random.randint(32500, 45000)
-            if ferm_test(self.p):
-                break
+    def generate_keys(self, nprimes=2, public_exponent=None):
+        """Генерация ключей RSA.
 
-        while(True):
-            self.q = random.randint(32500, 45000)
-            if ferm_test(self.q):
-                break
+        nprimes > 2 - модуль из nprimes простых; public_exponent - фиксированный
+        открытый ключ d (например, 65537) вместо случайного.
+        """
+        if nprimes == 2:
+            # Генерируем простые числа в диапазоне [32500, 45000]
+            while True:
+                self.p = random_prime(lo=32500, hi=45000)
+                if fits_exponent((self.p,), public_exponent):
+                    break
+
+            while True:
+                self.q = random_prime(lo=32500, hi=45000, exclude={self.p})
+                if fits_exponent((self.q,), public_exponent):
+                    break
+            self.extra_primes = []
+        else:
+            # N того же размера, около 30 бит
+            self.p, self.q, *self.extra_primes = generate_rsa_primes(
+                30, nprimes, public_exponent=public_exponent)
         
         # Вычисляем параметры
         self.n = self.p * self.q
         self.phi = (self.p - 1) * (self.q - 1)
+        for r in self.extra_primes:
+            self.n *= r
+            self.phi *= r - 1
         
         # Выбираем d (открытый ключ)
-        while True:
-            self.d = random.randint(2, self.phi - 1)
-            if extended_gcd(self.d, self.phi)[0] == 1:
-                break
+        if public_exponent:
+            self.d = public_exponent
+        else:
+            while True:
+                self.d = random.randint(2, self.phi - 1)
+                if gcd_only(self.d, self.phi) == 1:
+                    break
         
         # Вычисляем c (закрытый ключ)
         self.c = self._mod_inverse(self.d, self.phi)
+        self.key = RSAPrivateKey(self.n, self.c, self.p, self.q, *self.extra_primes)
         
         print(f"Сгенерированы ключи:")
         print(f"p = {self.p}")
         print(f"q = {self.q}")
+        if self.extra_primes:
+            print(f"Дополнительные простые = {self.extra_primes}")
         print(f"N = {self.n}")
         print(f"φ(N) = {self.phi}")
         print(f"Открытый ключ (d) = {self.d}")
@@ -47,10 +70,7 @@ class RSASignature:
     
     def _mod_inverse(self, a, m):
         """Вычисление обратного элемента по модулю"""
-        gcd, x, _ = extended_gcd(a, m)
-        if gcd != 1:
-            raise ValueError("Обратный элемент не существует")
-        return x % m
+        return inverse_only(a, m)
     
     def sign_file(self, filename, output_filename=None):
         """Подпись файла"""
@@ -65,13 +85,16 @@ class RSASignature:
         
         print(f"Хеш файла: {file_hash.hex()}")
         
+        if self.key is None or self.key.exponent != self.c:
+            self.key = RSAPrivateKey(self.n, self.c)
+        
         # Подпись каждого байта хеша
         signature_bytes = []
         for byte in file_hash:
             # Преобразуем байт в число
             h = byte
             # Подписываем: s = h^c mod N
-            s = fast_pow(h, self.c, self.n)
+            s = self.key.pow(h)
             signature_bytes.append(s)
         
         if output_filename is None:
@@ -128,6 +151,9 @@ class RSASignature:
         """Сохранение закрытого ключа"""
         with open(filename, 'w') as f:
             f.write(f"{self.p}\n{self.q}\n{self.n}\n{self.phi}\n{self.d}\n{self.c}")
+            # многопростой ключ: остальные простые седьмой строкой
+            if self.extra_primes:
+                f.write("\n" + " ".join(str(r) for r in self.extra_primes))
         print(f"Закрытый ключ сохранен в: {filename}")
     
     def load_private_key(self, filename):
@@ -140,6 +166,8 @@ class RSASignature:
         self.phi = int(lines[3].strip())
         self.d = int(lines[4].strip())
         self.c = int(lines[5].strip())
+        self.extra_primes = [int(r) for r in lines[6].split()] if len(lines) > 6 else []
+        self.key = RSAPrivateKey(self.n, self.c, self.p, self.q, *self.extra_primes)
         print(f"Закрытый ключ загружен")
 
 def main():
@@ -1,6 +1,7 @@
 import hashlib
 import random
-from lab1 import ferm_test, extended_gcd, fast_pow
+from modarith import gcd_only, inverse_only, fast_pow, fixed_base_pow, multi_pow, batch_inverse
+from primes import random_safe_prime
 
 class ElGamalSignature:
     def __init__(self):
@@ -12,18 +13,7 @@ class ElGamalSignature:
     
     def generate_keys(self):
         """Генерация ключей Эль-Гамаля"""
-        while True:
-            self.q = random.randint(2**15, 2**16)
-            if ferm_test(self.q):
-                p_temp = 2 * self.q + 1
-                if ferm_test(p_temp):
-                    self.p = p_temp
-                    break
-        
-        while True:
-            self.g = random.randint(2, self.p - 2)
-            if fast_pow(self.g, self.q, self.p) != 1:  # проверка условия g^q mod p != 1
-                break
+        self.p, self.q, self.g = random_safe_prime(lo=2**15, hi=2**16)
 
         self.x = random.randint(2, self.p - 2)
         
@@ -37,10 +27,7 @@ class ElGamalSignature:
     
     def _mod_inverse(self, a, m):
         """Вычисление обратного элемента по модулю"""
-        gcd, x, _ = extended_gcd(a, m)
-        if gcd != 1:
-            raise ValueError("Обратный элемент не существует")
-        return x % m
+        return inverse_only(a, m)
     
     def sign_file(self, filename, output_filename=None):
         """Подпись файла по схеме Эль-Гамаля (побайтовая подпись хеша)"""
@@ -57,19 +44,21 @@ class ElGamalSignature:
         r_list = []
         s_list = []
         
-        for byte in file_hash:
-            h = byte
-            
+        # Случайные k, взаимно простые с p-1, по одному на байт хеша
+        k_list = []
+        for _ in file_hash:
             while True:
                 k = random.randint(2, self.p - 2)
-                if extended_gcd(k, self.p - 1)[0] == 1:
+                if gcd_only(k, self.p - 1) == 1:
                     break
-            
+            k_list.append(k)
+        k_inv_list = batch_inverse(k_list, self.p - 1)
+        
+        for h, k, k_inv in zip(file_hash, k_list, k_inv_list):
             # Вычисляем r = g^k mod p
-            r = fast_pow(self.g, k, self.p)
+            r = fixed_base_pow(self.g, k, self.p)
             
             # Вычисляем s = (h - x*r) * k^(-1) mod (p-1)
-            k_inv = self._mod_inverse(k, self.p - 1)
             u = (h - self.x * r) % (self.p - 1)
             s = (u * k_inv) % (self.p - 1)
             
@@ -128,8 +117,8 @@ class ElGamalSignature:
                 continue
             
             # Проверяем подпись: g^h mod p = y^r * r^s mod p
-            left_side = fast_pow(self.g, h_byte, self.p)
-            right_side = (fast_pow(self.y, r, self.p) * fast_pow(r, s, self.p)) % self.p
+            left_side = fixed_base_pow(self.g, h_byte, self.p)
+            right_side = multi_pow([(self.y, r), (r, s)], self.p)
             
             if left_side == right_side:
                 valid_count += 1
@@ -0,0 +1,896 @@
+"""Общее арифметическое ядро: возведение в степень, НОД, проверка простоты.
+
+Все лабораторные, rgr.py и клиент/сервер Фиата-Шамира импортируют
+fast_pow, extended_gcd и ferm_test отсюда. ferm_test - это is_prime:
+пробное деление, Миллер-Рабин и Baillie-PSW вместо 50 раундов Ферма.
+
+Бэкенд возведения в степень выбирается при импорте:
+    gmpy2   - gmpy2.powmod, если библиотека установлена;
+    builtin - встроенный pow(a, x, p);
+    python  - эталонный цикл "квадрат и умножение";
+    window  - скользящее окно, ширина по длине показателя;
+    naf     - знаковое разбиение wNAF.
+Закрепить бэкенд можно переменной окружения MODEXP_BACKEND.
+
+Для фиксированного основания (генератор g в подписях и шифровании)
+fixed_base_pow берёт из LRU-кэша таблицу степеней g^(j * 2^(k*i)) mod p,
+и возведение в степень сводится к выборкам из таблицы и умножениям.
+
+ModContext(p) хранит константы редукции Барретта/Монтгомери для одного
+модуля; fast_pow сам берёт контекст из небольшого кэша для модулей от
+CONTEXT_MIN_BITS бит. Порог подобран benchmark_reduction() (запуск модуля).
+
+pow_many(bases, x, p) возводит много оснований в одну степень: разбиение
+показателя строится один раз, длинные списки делятся между процессами.
+
+Внутри count_multiplications() fast_pow считает умножения по местам вызова:
+сколько стоил бы двоичный метод и сколько стоит оконный.
+"""
+import math
+import os
+import random
+import sys
+from collections import OrderedDict
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+
+try:
+    import gmpy2
+except ImportError:
+    gmpy2 = None
+
+BACKEND_ENV = "MODEXP_BACKEND"
+
+
+def _pow_python(a, x, p):
+    """Эталонное возведение в степень (квадрат и умножение)"""
+    y = 1
+    a = a % p
+
+    while x > 0:
+        if x & 1:
+            y = (y * a) % p
+        a = (a * a) % p
+        x >>= 1
+
+    return y
+
+
+def _pow_builtin(a, x, p):
+    """Встроенный pow"""
+    return pow(a, x, p)
+
+
+def _pow_gmpy2(a, x, p):
+    """Возведение в степень через gmpy2"""
+    return int(gmpy2.powmod(a, x, p))
+
+
+def window_size(bits):
+    """Ширина окна по битовой длине показателя"""
+    if bits > 671:
+        return 6
+    if bits > 239:
+        return 5
+    if bits > 79:
+        return 4
+    if bits > 23:
+        return 3
+    return 1
+
+
+def _recode_sliding(x, k):
+    """Разбиение показателя скользящими окнами ширины k.
+
+    Возвращает список шагов (число возведений в квадрат, нечётная цифра)
+    от старших битов к младшим; цифра 0 означает только возведения в квадрат.
+    """
+    steps = []
+    i = x.bit_length() - 1
+    zeros = 0
+    while i >= 0:
+        if not (x >> i) & 1:
+            zeros += 1
+            i -= 1
+            continue
+        j = i - k + 1 if i >= k - 1 else 0
+        while not (x >> j) & 1:
+            j += 1
+        width = i - j + 1
+        steps.append((zeros + width, (x >> j) & ((1 << width) - 1)))
+        zeros = 0
+        i = j - 1
+    if zeros:
+        steps.append((zeros, 0))
+    return steps
+
+
+def _recode_naf(x, k):
+    """Разбиение показателя в знаковую форму wNAF (цифры до ±(2^k - 1))"""
+    mod = 1 << (k + 1)
+    half = mod >> 1
+    digits = []
+    while x:
+        if x & 1:
+            d = x & (mod - 1)
+            if d >= half:
+                d -= mod
+            x -= d
+        else:
+            d = 0
+        digits.append(d)
+        x >>= 1
+
+    steps = []
+    zeros = 0
+    for d in reversed(digits):
+        zeros += 1
+        if d:
+            steps.append((zeros, d))
+            zeros = 0
+    if zeros:
+        steps.append((zeros, 0))
+    return steps
+
+
+def _odd_powers(a, k, p):
+    """Таблица нечётных степеней a^1, a^3, ..., a^(2^k - 1)"""
+    table = [a]
+    if k > 1:
+        a2 = a * a % p
+        for _ in range((1 << (k - 1)) - 1):
+            table.append(table[-1] * a2 % p)
+    return table
+
+
+def _run_chain(table, steps, p, inv_table=None):
+    """Вычисление по готовому разбиению показателя"""
+    d = steps[0][1]
+    y = table[d >> 1] if d > 0 else inv_table[-d >> 1]
+    for s, d in steps[1:]:
+        for _ in range(s):
+            y = y * y % p
+        if d > 0:
+            y = y * table[d >> 1] % p
+        elif d < 0:
+            y = y * inv_table[-d >> 1] % p
+    return y
+
+
+def _pow_window(a, x, p):
+    """Возведение в степень скользящим окном"""
+    a = a % p
+    k = window_size(x.bit_length())
+    return _run_chain(_odd_powers(a, k, p), _recode_sliding(x, k), p)
+
+
+def _pow_naf(a, x, p):
+    """Возведение в степень по знаковому разбиению wNAF"""
+    a = a % p
+    try:
+        a_inv = pow(a, -1, p)
+    except ValueError:
+        # a необратимо по модулю p - отрицательные цифры недоступны
+        return _pow_window(a, x, p)
+    k = window_size(x.bit_length())
+    return _run_chain(_odd_powers(a, k, p), _recode_naf(x, k), p, _odd_powers(a_inv, k, p))
+
+
+_BACKENDS = {
+    'python': _pow_python,
+    'window': _pow_window,
+    'naf': _pow_naf,
+    'builtin': _pow_builtin,
+}
+if gmpy2 is not None:
+    _BACKENDS['gmpy2'] = _pow_gmpy2
+
+
+def available_backends():
+    """Список доступных бэкендов"""
+    return list(_BACKENDS)
+
+
+def _default_backend():
+    """Выбор бэкенда при импорте"""
+    name = os.environ.get(BACKEND_ENV, "").strip().lower()
+    if name:
+        if name not in _BACKENDS:
+            raise ValueError(f"Неизвестный бэкенд {name!r} в {BACKEND_ENV}, "
+                             f"доступны: {', '.join(_BACKENDS)}")
+        return name
+    if 'gmpy2' in _BACKENDS:
+        return 'gmpy2'
+    return 'builtin'
+
+
+_backend_name = _default_backend()
+_pow_impl = _BACKENDS[_backend_name]
+
+
+def get_backend():
+    """Имя текущего бэкенда"""
+    return _backend_name
+
+
+def set_backend(name):
+    """Переключение бэкенда во время работы"""
+    global _backend_name, _pow_impl
+    if name not in _BACKENDS:
+        raise ValueError(f"Неизвестный бэкенд {name!r}, доступны: {', '.join(_BACKENDS)}")
+    _backend_name = name
+    _pow_impl = _BACKENDS[name]
+
+
+# Статистика умножений по местам вызова, включается count_multiplications()
+_mul_stats = None
+
+
+def _chain_cost(steps, k, signed=False):
+    """Число модульных умножений (включая возведения в квадрат) для разбиения"""
+    cost = sum(s for s, _ in steps[1:]) + sum(1 for _, d in steps[1:] if d)
+    if k > 1:
+        # a^2 и нечётные степени, для wNAF то же для a^(-1)
+        cost += (1 << (k - 1)) * (2 if signed else 1)
+    return cost
+
+
+def _record_pow(x, frame):
+    """Учёт одного вызова fast_pow"""
+    code = frame.f_code
+    site = f"{os.path.basename(code.co_filename)}:{frame.f_lineno} {code.co_name}"
+    k = window_size(x.bit_length())
+    signed = _backend_name == 'naf'
+    steps = _recode_naf(x, k) if signed else _recode_sliding(x, k)
+
+    entry = _mul_stats.setdefault(site, {'calls': 0, 'binary': 0, 'window': 0})
+    entry['calls'] += 1
+    entry['binary'] += x.bit_length() - 1 + x.bit_count() - 1
+    entry['window'] += _chain_cost(steps, k, signed)
+
+
+@contextmanager
+def count_multiplications():
+    """Подсчёт умножений fast_pow по местам вызова.
+
+    Возвращает словарь {место вызова: {'calls', 'binary', 'window'}}, где
+    binary - умножения двоичного метода, window - оконного.
+    """
+    global _mul_stats
+    previous = _mul_stats
+    _mul_stats = stats = {}
+    try:
+        yield stats
+    finally:
+        _mul_stats = previous
+
+
+def print_mul_stats(stats):
+    """Вывод статистики умножений"""
+    print(f"{'Место вызова':<40} {'вызовов':>8} {'двоичный':>10} {'оконный':>10} {'экономия':>9}")
+    for site, entry in sorted(stats.items(), key=lambda item: -item[1]['binary']):
+        saved = 1 - entry['window'] / entry['binary'] if entry['binary'] else 0.0
+        print(f"{site:<40} {entry['calls']:>8} {entry['binary']:>10} {entry['window']:>10} {saved:>8.1%}")
+
+
+# С этой длины делителя extended_gcd набирает частные по старшим словам
+# (метод Лемера); ниже в CPython выгоднее обычный алгоритм Евклида
+LEHMER_MIN_BITS = 4096
+# Длина старших слов в методе Лемера
+LEHMER_DIGIT_BITS = 62
+
+
+def extended_gcd(a, b):
+    """Нахождение НОД: [g, x, y], где a*x + b*y = g.
+
+    Отслеживается только x, y восстанавливается делением в конце.
+    Ответ тот же, что у классического алгоритма с частными u // v,
+    в том числе для нуля и отрицательных a, b.
+    """
+    u, v = a, b
+    x0, x1 = 1, 0
+    if 0 < u < v:
+        # первый шаг Евклида с частным 0
+        u, v = v, u
+        x0, x1 = 0, 1
+
+    # При разных знаках остатки с u // v идут не так, как у |u| и |v|,
+    # поэтому старшие слова годятся только для положительных u и v
+    while u > 0 and v > 0 and v.bit_length() > LEHMER_MIN_BITS:
+        # Частные по старшим словам u и v, пока они совпадают с точными
+        n = u.bit_length() - LEHMER_DIGIT_BITS
+        uh = u >> n
+        vh = v >> n
+        A, B, C, D = 1, 0, 0, 1
+        while vh + C and vh + D:
+            q = (uh + A) // (vh + C)
+            if q != (uh + B) // (vh + D):
+                break
+            A, C = C, A - q * C
+            B, D = D, B - q * D
+            uh, vh = vh, uh - q * vh
+        if B:
+            u, v = A * u + B * v, C * u + D * v
+            x0, x1 = A * x0 + B * x1, C * x0 + D * x1
+        else:
+            q, r = divmod(u, v)
+            u, v = v, r
+            x0, x1 = x1, x0 - q * x1
+
+    while v:
+        q, r = divmod(u, v)
+        u, v = v, r
+        x0, x1 = x1, x0 - q * x1
+    return [u, x0, (u - a * x0) // b if b else 0]
+
+
+def gcd_only(a, b):
+    """НОД без коэффициентов Безу - для проверок взаимной простоты"""
+    return math.gcd(a, b)
+
+
+def fast_pow(a, x, p):
+    """Быстрое возведение в степень"""
+    if x <= 0:
+        return 1
+    if _mul_stats is not None:
+        _record_pow(x, sys._getframe(1))
+    if p.bit_length() >= CONTEXT_MIN_BITS:
+        return get_context(p).pow(a, x)
+    return _pow_impl(a, x, p)
+
+
+def primes_below(limit):
+    """Простые числа меньше limit (решето Эратосфена)"""
+    if limit < 3:
+        return []
+    sieve = bytearray([1]) * limit
+    sieve[0] = sieve[1] = 0
+    for i in range(2, math.isqrt(limit - 1) + 1):
+        if sieve[i]:
+            sieve[i * i::i] = bytes(len(range(i * i, limit, i)))
+    return [i for i, flag in enumerate(sieve) if flag]
+
+
+# Таблица малых простых для пробного деления
+SMALL_PRIMES = primes_below(2000)
+_SMALL_PRIME_SET = frozenset(SMALL_PRIMES)
+# Произведение малых простых: одно вычисление НОД вместо сотен делений
+_SMALL_PRIMORIAL = math.prod(SMALL_PRIMES)
+# Основания, при которых тест Миллера-Рабина точен для n < 2^64
+_MR_BASES_64 = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
+
+def _miller_rabin(n, a):
+    """Сильный тест на простоту по основанию a"""
+    d = n - 1
+    s = 0
+    while not d & 1:
+        d >>= 1
+        s += 1
+    x = fast_pow(a, d, n)
+    if x == 1 or x == n - 1:
+        return True
+    for _ in range(s - 1):
+        x = x * x % n
+        if x == n - 1:
+            return True
+    return False
+
+
+def _jacobi(a, n):
+    """Символ Якоби (a/n) для нечётного n > 0"""
+    a %= n
+    result = 1
+    while a:
+        while not a & 1:
+            a >>= 1
+            if n & 7 in (3, 5):
+                result = -result
+        a, n = n, a
+        if a & 3 == 3 and n & 3 == 3:
+            result = -result
+        a %= n
+    return result if n == 1 else 0
+
+
+def _strong_lucas(n):
+    """Сильный тест Люка с параметрами Селфриджа"""
+    D = 5
+    while True:
+        j = _jacobi(D, n)
+        if j == -1:
+            break
+        if j == 0 and abs(D) != n:
+            return False
+        D = -D - 2 if D > 0 else -D + 2
+    P = 1
+    Q = (1 - D) // 4
+
+    d = n + 1
+    s = 0
+    while not d & 1:
+        d >>= 1
+        s += 1
+
+    def half(v):
+        return (v + n if v & 1 else v) >> 1
+
+    U, V, Qk = 1, P, Q % n
+    for bit in bin(d)[3:]:
+        U = U * V % n
+        V = (V * V - 2 * Qk) % n
+        Qk = Qk * Qk % n
+        if bit == '1':
+            U, V = half((P * U + V) % n), half((D * U + P * V) % n)
+            Qk = Qk * Q % n
+    if U == 0 or V == 0:
+        return True
+    for _ in range(s - 1):
+        V = (V * V - 2 * Qk) % n
+        Qk = Qk * Qk % n
+        if V == 0:
+            return True
+    return False
+
+
+def _extra_rounds(bits):
+    """Дополнительные раунды Миллера-Рабина со случайными основаниями"""
+    if bits >= 1024:
+        return 2
+    if bits >= 512:
+        return 3
+    if bits >= 256:
+        return 4
+    return 6
+
+
+def is_prime(n):
+    """Проверка на простоту.
+
+    Пробное деление на малые простые, затем Миллер-Рабин: для n < 2^64
+    с детерминированным набором оснований, выше - тест Baillie-PSW
+    и несколько раундов со случайными основаниями.
+    """
+    if n < 2:
+        return False
+    if n in _SMALL_PRIME_SET:
+        return True
+    if math.gcd(n, _SMALL_PRIMORIAL) != 1:
+        return False
+    if n < SMALL_PRIMES[-1] ** 2:
+        return True
+
+    if not _miller_rabin(n, 2):
+        return False
+    if n < 1 << 64:
+        return all(_miller_rabin(n, a) for a in _MR_BASES_64[1:])
+
+    if math.isqrt(n) ** 2 == n or not _strong_lucas(n):
+        return False
+    for _ in range(_extra_rounds(n.bit_length())):
+        if not _miller_rabin(n, random.randint(2, n - 2)):
+            return False
+    return True
+
+
+# Прежнее имя: все лабораторные проверяют простоту через ferm_test
+ferm_test = is_prime
+
+
+def inverse_only(a, m):
+    """Нахождение обратного элемента по модулю без второго коэффициента Безу"""
+    try:
+        return pow(a, -1, m)
+    except ValueError:
+        raise ValueError(f"Обратный элемент не существует для a={a}, m={m}") from None
+
+
+mod_inverse = inverse_only
+
+
+def batch_inverse(values, m):
+    """Обратные элементы для списка значений по модулю m (трюк Монтгомери).
+
+    Одно обращение и 3(n-1) умножений вместо n вызовов inverse_only.
+    Для значений, равных 0 по модулю m, возвращается 0.
+    """
+    values = [v % m for v in values]
+    prefix = []
+    acc = 1
+    for v in values:
+        if v:
+            acc = acc * v % m
+        prefix.append(acc)
+
+    try:
+        inv = inverse_only(acc, m)
+    except ValueError:
+        raise ValueError(f"Не все значения обратимы по модулю m={m}") from None
+
+    result = [0] * len(values)
+    for i in range(len(values) - 1, -1, -1):
+        v = values[i]
+        if not v:
+            continue
+        result[i] = inv * (prefix[i - 1] if i else 1) % m
+        inv = inv * v % m
+    return result
+
+
+
+def _window_positions(x, k):
+    """Окна показателя в виде пар (номер младшего бита окна, нечётная цифра)"""
+    i = x.bit_length() - 1
+    while i >= 0:
+        if not (x >> i) & 1:
+            i -= 1
+            continue
+        j = i - k + 1 if i >= k - 1 else 0
+        while not (x >> j) & 1:
+            j += 1
+        yield j, (x >> j) & ((1 << (i - j + 1)) - 1)
+        i = j - 1
+
+
+# Длина модуля, с которой multi_pow на бэкенде builtin считает общей
+# цепочкой: для двух пар показателей длины модуля цепочка на Python
+# медленнее двух встроенных pow в 6 раз при 17 битах, в 1.2 раза при
+# 160, наравне при 256 и быстрее в 1.35 раза при 512
+MULTI_POW_MIN_BITS = 512
+
+
+def multi_pow(pairs, p):
+    """Произведение b_i^e_i mod p за один проход возведений в квадрат.
+
+    Трюк Штрауса-Шамира: у каждого основания своя таблица нечётных степеней,
+    окна всех показателей обрабатываются в общей цепочке возведений в квадрат.
+    С gmpy2, а с builtin до MULTI_POW_MIN_BITS - произведение отдельных
+    степеней: там цепочка на Python проигрывает.
+    """
+    pairs = [(b % p, e) for b, e in pairs if e > 0]
+    if not pairs:
+        return 1
+    if _backend_name == 'gmpy2' or (_backend_name == 'builtin'
+                                    and p.bit_length() < MULTI_POW_MIN_BITS):
+        y = 1
+        for b, e in pairs:
+            y = y * _pow_impl(b, e, p) % p
+        return y
+
+    bits = max(e.bit_length() for _, e in pairs)
+    k = window_size(bits)
+    events = {}
+    for b, e in pairs:
+        table = _odd_powers(b, k, p)
+        for j, d in _window_positions(e, k):
+            events.setdefault(j, []).append(table[d >> 1])
+
+    y = 1
+    started = False
+    for i in range(bits - 1, -1, -1):
+        if started:
+            y = y * y % p
+        for t in events.get(i, ()):
+            y = y * t % p
+            started = True
+    return y % p
+
+
+# Число оснований, с которого pow_many раздаёт работу процессам:
+# запуск пула стоит десятки миллисекунд
+POW_MANY_PARALLEL_MIN = 1024
+# Число процессов для pow_many по умолчанию (1 - без пула)
+POW_WORKERS = int(os.environ.get("POW_WORKERS", "1"))
+
+
+def _pow_many_plain(bases, x, p):
+    """Степени по обычному модулю: разбиение показателя строится один раз"""
+    if _backend_name not in ('window', 'naf'):
+        return [_pow_impl(b, x, p) for b in bases]
+    k = window_size(x.bit_length())
+    steps = _recode_sliding(x, k)
+    if _backend_name == 'window':
+        return [_run_chain(_odd_powers(b % p, k, p), steps, p) for b in bases]
+    naf = _recode_naf(x, k)
+    result = []
+    for b in bases:
+        b %= p
+        try:
+            b_inv = pow(b, -1, p)
+        except ValueError:
+            result.append(_run_chain(_odd_powers(b, k, p), steps, p))
+            continue
+        result.append(_run_chain(_odd_powers(b, k, p), naf, p, _odd_powers(b_inv, k, p)))
+    return result
+
+
+def _pow_many_serial(bases, x, p):
+    if p.bit_length() >= CONTEXT_MIN_BITS:
+        return get_context(p).pow_many(bases, x)
+    return _pow_many_plain(bases, x, p)
+
+
+def _pow_many_task(bases, x, p, backend):
+    """Часть pow_many в процессе пула с бэкендом родителя"""
+    if backend != _backend_name:
+        set_backend(backend)
+    return _pow_many_serial(bases, x, p)
+
+
+def pow_many(bases, x, p, workers=None):
+    """[b^x mod p для b из bases] с одним показателем для всех оснований.
+
+    Разбиение показателя на окна строится один раз на весь список.
+    При workers > 1 (по умолчанию POW_WORKERS) и не меньше
+    POW_MANY_PARALLEL_MIN основаниях список делится между процессами.
+    """
+    bases = list(bases)
+    if x <= 0:
+        return [1] * len(bases)
+    if _mul_stats is not None:
+        frame = sys._getframe(1)
+        for _ in bases:
+            _record_pow(x, frame)
+    if workers is None:
+        workers = POW_WORKERS
+    if workers <= 1 or len(bases) < POW_MANY_PARALLEL_MIN:
+        return _pow_many_serial(bases, x, p)
+
+    size = -(-len(bases) // workers)
+    chunks = [bases[i:i + size] for i in range(0, len(bases), size)]
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        parts = ex.map(_pow_many_task, chunks, [x] * len(chunks),
+                       [p] * len(chunks), [_backend_name] * len(chunks))
+        return [y for part in parts for y in part]
+
+
+# Длина модуля, с которой редукция Барретта обгоняет встроенный % (benchmark_reduction)
+BARRETT_MIN_BITS = 12288
+# Длина модуля, с которой fast_pow работает через ModContext
+CONTEXT_MIN_BITS = BARRETT_MIN_BITS
+
+
+class ModContext:
+    """Контекст модуля p: константы редукции вычисляются один раз.
+
+    method:
+        plain      - обычный %, возведение в степень через текущий бэкенд;
+        barrett    - редукция Барретта;
+        montgomery - умножение Монтгомери (только для нечётного p).
+    По умолчанию barrett для модулей от BARRETT_MIN_BITS бит, иначе plain.
+    """
+
+    def __init__(self, p, method=None):
+        if p < 2:
+            raise ValueError("Модуль должен быть больше 1")
+        self.p = p
+        self.bits = p.bit_length()
+        if method is None:
+            method = 'barrett' if self.bits >= BARRETT_MIN_BITS else 'plain'
+        if method == 'montgomery' and not p & 1:
+            raise ValueError("Умножение Монтгомери требует нечётного модуля")
+        if method not in ('plain', 'barrett', 'montgomery'):
+            raise ValueError(f"Неизвестный метод редукции {method!r}")
+        self.method = method
+
+        # Барретт: mu = floor(4^k / p)
+        self.mu = (1 << (2 * self.bits)) // p
+        # Монтгомери: R = 2^k, p' = -p^(-1) mod R
+        if p & 1:
+            self.r_mask = (1 << self.bits) - 1
+            self.p_prime = -pow(p, -1, 1 << self.bits) & self.r_mask
+            self.r2 = (1 << (2 * self.bits)) % p
+
+    def reduce(self, t):
+        """t mod p для 0 <= t < p^2"""
+        if self.method != 'barrett':
+            return t % self.p
+        q = ((t >> (self.bits - 1)) * self.mu) >> (self.bits + 1)
+        r = t - q * self.p
+        while r >= self.p:
+            r -= self.p
+        return r
+
+    def mul(self, a, b):
+        """a * b mod p"""
+        return self.reduce(a * b)
+
+    def sqr(self, a):
+        """a^2 mod p"""
+        return self.reduce(a * a)
+
+    def mont_mul(self, a, b):
+        """Произведение Монтгомери a * b * R^(-1) mod p"""
+        t = a * b
+        u = (t + ((t & self.r_mask) * self.p_prime & self.r_mask) * self.p) >> self.bits
+        return u - self.p if u >= self.p else u
+
+    def to_mont(self, a):
+        """Перевод в форму Монтгомери"""
+        return self.mont_mul(a % self.p, self.r2)
+
+    def from_mont(self, a):
+        """Перевод из формы Монтгомери"""
+        return self.mont_mul(a, 1)
+
+    def pow(self, a, x):
+        """a^x mod p"""
+        if x <= 0:
+            return 1
+        if self.method == 'plain':
+            return _pow_impl(a, x, self.p)
+        if self.method == 'montgomery':
+            return self.from_mont(self._chain(self.to_mont(a), x, self.mont_mul))
+        return self._chain(a % self.p, x, self.mul)
+
+    def pow_many(self, bases, x):
+        """[a^x mod p для a из bases], разбиение показателя строится один раз"""
+        if x <= 0:
+            return [1] * len(bases)
+        if self.method == 'plain':
+            return _pow_many_plain(bases, x, self.p)
+        steps = _recode_sliding(x, window_size(x.bit_length()))
+        if self.method == 'montgomery':
+            return [self.from_mont(self._chain(self.to_mont(a), x, self.mont_mul, steps))
+                    for a in bases]
+        return [self._chain(a % self.p, x, self.mul, steps) for a in bases]
+
+    def _chain(self, a, x, mul, steps=None):
+        """Скользящее окно с заданным умножением (steps - готовое разбиение x)"""
+        k = window_size(x.bit_length())
+        if steps is None:
+            steps = _recode_sliding(x, k)
+        table = [a]
+        if k > 1:
+            a2 = mul(a, a)
+            for _ in range((1 << (k - 1)) - 1):
+                table.append(mul(table[-1], a2))
+        y = table[steps[0][1] >> 1]
+        for s, d in steps[1:]:
+            for _ in range(s):
+                y = mul(y, y)
+            if d:
+                y = mul(y, table[d >> 1])
+        return y
+
+    def inverse(self, a):
+        """a^(-1) mod p"""
+        return mod_inverse(a, self.p)
+
+
+@lru_cache(maxsize=16)
+def get_context(p):
+    """ModContext для модуля p из небольшого кэша"""
+    return ModContext(p)
+
+
+def benchmark_reduction(bit_lengths=(256, 512, 1024, 2048, 4096, 8192, 16384),
+                        exponent_bits=1024, seconds=0.2):
+    """Сравнение plain / barrett / montgomery на возведении в степень.
+
+    Возвращает наименьшую длину модуля, с которой Барретт или Монтгомери
+    быстрее обычного %, либо None.
+    """
+    def measure(ctx, a, x):
+        runs = 0
+        start = time.perf_counter()
+        while True:
+            ctx.pow(a, x)
+            runs += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= seconds:
+                return elapsed / runs
+
+    crossover = None
+    print(f"{'бит':>6} {'plain':>11} {'barrett':>11} {'montgomery':>11}")
+    for bits in bit_lengths:
+        p = random.getrandbits(bits) | (1 << (bits - 1)) | 1
+        a = random.randrange(2, p)
+        x = random.getrandbits(exponent_bits) | 1
+        times = [measure(ModContext(p, method), a, x) for method in ('plain', 'barrett', 'montgomery')]
+        print(f"{bits:>6} " + " ".join(f"{t * 1e3:>9.3f}мс" for t in times))
+        if crossover is None and min(times[1:]) < times[0]:
+            crossover = bits
+    print(f"Точка пересечения: {crossover if crossover else 'не найдена'} бит")
+    return crossover
+
+
+def main():
+    benchmark_reduction()
+
+
+# Ограничение памяти кэша таблиц фиксированного основания (в байтах)
+FIXED_BASE_CACHE_BYTES = 16 * 2**20
+# Таблица строится, когда основание встретилось столько раз
+FIXED_BASE_MIN_USES = 2
+
+
+class FixedBase:
+    """Таблица для возведения фиксированного основания g в степень по модулю p"""
+
+    def __init__(self, g, p, max_bits=None, k=None):
+        self.g = g % p
+        self.p = p
+        self.max_bits = max_bits or p.bit_length()
+        self.k = k or (8 if self.max_bits <= 64 else 5)
+
+        # rows[i][j] = g^(j * 2^(k*i)) mod p
+        self.rows = []
+        base = self.g
+        for _ in range((self.max_bits + self.k - 1) // self.k):
+            row = [1] * (1 << self.k)
+            for j in range(1, 1 << self.k):
+                row[j] = row[j - 1] * base % p
+            self.rows.append(row)
+            base = row[-1] * base % p
+
+    def nbytes(self):
+        """Примерный объём таблицы в памяти"""
+        return len(self.rows) * (1 << self.k) * sys.getsizeof(self.p)
+
+    def pow(self, x):
+        """g^x mod p"""
+        if x.bit_length() > self.max_bits:
+            return fast_pow(self.g, x, self.p)
+        p = self.p
+        mask = (1 << self.k) - 1
+        y = 1
+        for row in self.rows:
+            if not x:
+                break
+            d = x & mask
+            if d:
+                y = y * row[d] % p
+            x >>= self.k
+        return y % p
+
+
+_fixed_base_cache = OrderedDict()
+_fixed_base_bytes = 0
+_fixed_base_uses = {}
+
+
+def get_fixed_base(g, p):
+    """Таблица для (g, p) из LRU-кэша; None, пока основание не стало частым"""
+    global _fixed_base_bytes
+    key = (g % p, p)
+    table = _fixed_base_cache.get(key)
+    if table is not None:
+        _fixed_base_cache.move_to_end(key)
+        return table
+
+    uses = _fixed_base_uses.get(key, 0) + 1
+    if uses < FIXED_BASE_MIN_USES:
+        if len(_fixed_base_uses) > 1024:
+            _fixed_base_uses.clear()
+        _fixed_base_uses[key] = uses
+        return None
+    _fixed_base_uses.pop(key, None)
+
+    table = FixedBase(g, p)
+    size = table.nbytes()
+    if size > FIXED_BASE_CACHE_BYTES:
+        return None
+    while _fixed_base_bytes + size > FIXED_BASE_CACHE_BYTES:
+        _, old = _fixed_base_cache.popitem(last=False)
+        _fixed_base_bytes -= old.nbytes()
+    _fixed_base_cache[key] = table
+    _fixed_base_bytes += size
+    return table
+
+
+def fixed_base_pow(g, x, p):
+    """g^x mod p для часто используемого основания g"""
+    if x <= 0:
+        return 1
+    table = get_fixed_base(g, p)
+    if table is None:
+        return fast_pow(g, x, p)
+    return table.pow(x)
+
+
+if __name__ == "__main__":
+    main()
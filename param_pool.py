@@ -0,0 +1,174 @@
+"""Пул заранее сгенерированных параметров.
+
+Простые, безопасные простые и группы (p, q, g) хранятся в JSON-файле
+по ключу "вид:биты". Заполняет пул fill (пул процессов) или фоновый
+поток start_filler, потребители забирают записи через take.
+Если пул пуст, запись генерируется на месте, как без пула.
+
+Заполнение из командной строки:
+    python param_pool.py prime 128 50
+    python param_pool.py status
+"""
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from primes import random_prime, random_safe_prime, random_schnorr_group
+
+POOL_PATH = os.environ.get(
+    "PARAM_POOL",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "param_pool.json"),
+)
+
+# вид записи -> генератор одной записи по битовой длине
+GENERATORS = {
+    "prime": random_prime,          # простое длины bits
+    "safe": random_safe_prime,      # (p, q, g), p = 2q + 1 длины bits
+    "schnorr": random_schnorr_group,  # (p, q, g), q длины bits
+}
+
+# Блокировка старше этого числа секунд считается брошенной
+LOCK_TIMEOUT = 30
+
+
+def _key(kind, bits):
+    if kind not in GENERATORS:
+        raise ValueError(f"Неизвестный вид параметров: {kind}")
+    return f"{kind}:{bits}"
+
+
+@contextmanager
+def _locked(path):
+    """Межпроцессная блокировка файла пула через создание path.lock"""
+    lock = path + ".lock"
+    while True:
+        try:
+            fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock) > LOCK_TIMEOUT:
+                    os.remove(lock)
+                    continue
+            except OSError:
+                pass
+            time.sleep(0.01)
+    try:
+        yield
+    finally:
+        os.close(fd)
+        os.remove(lock)
+
+
+def _load(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _save(path, pool):
+    """Запись через временный файл и os.replace, чтобы не оставить файл недописанным"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(pool, f)
+    os.replace(tmp, path)
+
+
+def _entry(value):
+    return tuple(value) if isinstance(value, list) else value
+
+
+def level(kind, bits, path=None):
+    """Число записей вида kind длины bits в пуле"""
+    return len(_load(path or POOL_PATH).get(_key(kind, bits), []))
+
+
+def take(kind, bits, consume=True, path=None):
+    """Запись из пула.
+
+    consume=True - запись удаляется и больше никому не достанется
+    (секретные простые). consume=False - открытые параметры используются
+    повторно; при пустом пуле сгенерированная запись сохраняется.
+    """
+    path = path or POOL_PATH
+    key = _key(kind, bits)
+    with _locked(path):
+        pool = _load(path)
+        entries = pool.get(key)
+        if entries:
+            if not consume:
+                return _entry(entries[0])
+            value = entries.pop(0)
+            _save(path, pool)
+            return _entry(value)
+    value = GENERATORS[kind](bits)
+    if not consume:
+        put(kind, bits, [value], path)
+    return value
+
+
+def put(kind, bits, values, path=None):
+    """Добавляет записи в пул"""
+    path = path or POOL_PATH
+    key = _key(kind, bits)
+    with _locked(path):
+        pool = _load(path)
+        pool.setdefault(key, []).extend(values)
+        _save(path, pool)
+
+
+def fill(kind, bits, count, workers=None, path=None):
+    """Генерирует count записей в пуле процессов и добавляет их в пул"""
+    _key(kind, bits)
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        values = list(ex.map(GENERATORS[kind], [bits] * count))
+    put(kind, bits, values, path)
+    return len(values)
+
+
+def start_filler(specs, low=4, high=16, workers=None, interval=5.0, path=None):
+    """Фоновый поток, который доливает пул.
+
+    specs - список пар (вид, биты). Когда записей становится меньше low,
+    пул дополняется до high. Возвращает (поток, событие остановки).
+    """
+    stop = threading.Event()
+
+    def run():
+        while not stop.is_set():
+            for kind, bits in specs:
+                n = level(kind, bits, path)
+                if n < low:
+                    fill(kind, bits, high - n, workers, path)
+            stop.wait(interval)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread, stop
+
+
+def main():
+    args = sys.argv[1:]
+    if not args or args[0] == "status":
+        pool = _load(POOL_PATH)
+        print(f"Пул: {POOL_PATH}")
+        for key in sorted(pool):
+            print(f"{key}: {len(pool[key])}")
+        return
+    if len(args) < 3:
+        print("Использование: python param_pool.py <prime|safe|schnorr> <биты> <количество> [процессы]")
+        return
+    kind, bits, count = args[0], int(args[1]), int(args[2])
+    workers = int(args[3]) if len(args) > 3 else None
+    t = time.perf_counter()
+    n = fill(kind, bits, count, workers)
+    print(f"Добавлено {n} записей {_key(kind, bits)} за {time.perf_counter() - t:.2f} с")
+
+
+if __name__ == "__main__":
+    main()
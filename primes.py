@@ -0,0 +1,306 @@
+"""Генерация простых чисел.
+
+random_prime выбирает одну случайную стартовую точку, просеивает окно
+нечётных кандидатов по таблице малых простых (bytearray) и запускает
+дорогую проверку is_prime только на выживших.
+
+factorize раскладывает число на простые: пробное деление по малым
+простым, остаток - ро-методом Полларда-Брента.
+"""
+import bisect
+import math
+import os
+import random
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+from modarith import fast_pow, is_prime, primes_below
+
+# Нечётные простые для просеивания окна кандидатов
+SIEVE_PRIMES = primes_below(40000)[1:]
+# Наибольшее число нечётных кандидатов в одном окне
+SIEVE_WINDOW = 4096
+# Число процессов для random_primes по умолчанию (1 - последовательный поиск)
+PRIME_WORKERS = int(os.environ.get("PRIME_WORKERS", "1"))
+
+
+def sieve_window(start, count, limit=None):
+    """Флаги кандидатов start, start + 2, ..., start + 2(count - 1).
+
+    start нечётное; 0 - кандидат делится на малое простое до limit
+    (и не равен ему).
+    """
+    primes = SIEVE_PRIMES
+    if limit is not None:
+        primes = primes[:bisect.bisect_right(primes, limit)]
+    flags = bytearray([1]) * count
+    for r in primes:
+        _strike(flags, start, count, r, 0)
+    return flags
+
+
+def _strike(flags, start, count, r, res):
+    """Обнуляет флаги кандидатов start + 2i ≡ res (mod r), кроме самого res или r"""
+    # (r + 1) / 2 - обратный к 2 по модулю r
+    i = (res - start) * ((r + 1) >> 1) % r
+    if start + 2 * i == (res or r):
+        i += r
+    if i + r < count:
+        flags[i::r] = bytes(len(range(i, count, r)))
+    elif i < count:
+        flags[i] = 0
+
+
+def sieve_safe_window(start, count, limit=None):
+    """Флаги кандидатов q = start + 2i, для которых ни q, ни 2q + 1
+    не делятся на малые простые до limit.
+
+    2q + 1 ≡ 0 (mod r) равносильно q ≡ (r - 1) / 2 (mod r).
+    """
+    primes = SIEVE_PRIMES
+    if limit is not None:
+        primes = primes[:bisect.bisect_right(primes, limit)]
+    flags = bytearray([1]) * count
+    for r in primes:
+        _strike(flags, start, count, r, 0)
+        _strike(flags, start, count, r, r >> 1)
+    return flags
+
+
+def _prime_range(bits, lo, hi, top_bit):
+    """Границы поиска [lo, hi] по битовой длине или явному диапазону"""
+    if bits is not None:
+        if bits < 2:
+            raise ValueError("Битовая длина простого должна быть не меньше 2")
+        lo = 1 << (bits - 1) if top_bit else 2
+        hi = (1 << bits) - 1
+    if lo is None or hi is None:
+        raise ValueError("Нужно задать bits или диапазон lo, hi")
+    if hi < lo:
+        raise ValueError(f"Пустой диапазон [{lo}, {hi}]")
+    return lo, hi
+
+
+def random_prime(bits=None, lo=None, hi=None, exclude=(), top_bit=True, stop=None):
+    """Случайное простое из [lo, hi] или длины bits бит.
+
+    exclude - простые, которые нельзя вернуть (например, уже выбранное p).
+    top_bit - при заданном bits старший бит установлен, т.е. длина ровно bits.
+    stop - функция без аргументов, проверяется перед каждым окном; если
+    она вернула истину, поиск прекращается с результатом None.
+    Поиск идёт вверх от случайной точки с переходом на начало диапазона.
+    """
+    lo, hi = _prime_range(bits, lo, hi, top_bit)
+    exclude = set(exclude)
+
+    first = lo | 1
+    last = hi if hi & 1 else hi - 1
+    if first <= last:
+        bits = hi.bit_length()
+        # для коротких кандидатов проверка дешевле просеивания большими простыми
+        limit = bits * bits // 8
+        start = random.randint(lo, hi) | 1
+        if start > last:
+            start = first
+        # [start, last], затем [first, start)
+        for seg_lo, seg_hi in ((start, last), (first, start - 2)):
+            c = seg_lo
+            while c <= seg_hi:
+                if stop is not None and stop():
+                    return None
+                # простые встречаются примерно раз в 0.35 * bits нечётных чисел
+                count = min(SIEVE_WINDOW, max(64, bits), (seg_hi - c) // 2 + 1)
+                flags = sieve_window(c, count, limit)
+                for i in range(count):
+                    if flags[i]:
+                        n = c + 2 * i
+                        if n not in exclude and is_prime(n):
+                            return n
+                c += 2 * count
+
+    if lo <= 2 <= hi and 2 not in exclude:
+        return 2
+    raise ValueError(f"В диапазоне [{lo}, {hi}] нет подходящих простых")
+
+
+def _prime_task(name, seed, bits, exclude):
+    """Поиск в процессе пула со своим потоком случайных чисел.
+
+    Между окнами проверяется флаг в общей памяти name: его поднимает
+    родитель, когда простых набралось достаточно.
+    """
+    random.seed(seed)
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        return random_prime(bits, exclude=exclude, stop=lambda: shm.buf[0])
+    finally:
+        shm.close()
+
+
+def random_primes(bits, count=2, workers=None, exclude=()):
+    """count различных случайных простых длины bits (например, p и q для N).
+
+    При workers > 1 процессы пула независимо ищут простые от своих
+    случайных стартов; ожидаемое время поиска одного простого падает
+    почти пропорционально числу процессов. Как только найдено count
+    различных простых, оставшиеся задачи отменяются, а работающие
+    замечают флаг в общей памяти и завершаются до возврата из функции.
+    """
+    if workers is None:
+        workers = PRIME_WORKERS
+    found = []
+    exclude = set(exclude)
+    if workers <= 1:
+        while len(found) < count:
+            found.append(random_prime(bits, exclude=exclude))
+            exclude.add(found[-1])
+        return found
+
+    shm = shared_memory.SharedMemory(create=True, size=1)
+    ex = ProcessPoolExecutor(max_workers=workers)
+    try:
+        shm.buf[0] = 0
+        pending = {ex.submit(_prime_task, shm.name, random.getrandbits(64), bits, exclude)
+                   for _ in range(workers)}
+        while len(found) < count:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                n = f.result()
+                if n not in exclude and len(found) < count:
+                    found.append(n)
+                    exclude.add(n)
+                if len(found) < count:
+                    pending.add(ex.submit(_prime_task, shm.name, random.getrandbits(64),
+                                          bits, exclude))
+    finally:
+        shm.buf[0] = 1
+        ex.shutdown(wait=True, cancel_futures=True)
+        shm.close()
+        shm.unlink()
+    return found
+
+
+def _is_safe_pair(q):
+    """Проверка пары q, p = 2q + 1, прошедшей просеивание.
+
+    Сначала дешёвый тест Ферма по основанию 2 для q и для p, затем
+    полная проверка q. Простота p при простом q следует из признака
+    Поклингтона: 2^(p-1) ≡ 1 (mod p) и НОД(2^2 - 1, p) = 1.
+    """
+    p = 2 * q + 1
+    if fast_pow(2, q - 1, q) != 1:
+        return False
+    if p % 3 == 0 or fast_pow(2, p - 1, p) != 1:
+        return False
+    return is_prime(q)
+
+
+def random_safe_prime(bits=None, lo=None, hi=None):
+    """Случайное безопасное простое p = 2q + 1 и образующая g группы Z_p*.
+
+    bits - длина p в битах; lo, hi - границы для q.
+    Возвращает (p, q, g).
+    """
+    if bits is not None:
+        if bits < 3:
+            raise ValueError("Битовая длина безопасного простого должна быть не меньше 3")
+        lo, hi = _prime_range(bits - 1, None, None, True)
+    else:
+        lo, hi = _prime_range(None, lo, hi, True)
+
+    q = None
+    first = max(lo, 3) | 1
+    last = hi if hi & 1 else hi - 1
+    if first <= last:
+        # для пар выгодно просеивать дольше, чем для одиночных простых
+        limit = hi.bit_length() ** 2
+        start = random.randint(first, last) | 1
+        for seg_lo, seg_hi in ((start, last), (first, start - 2)):
+            c = seg_lo
+            while c <= seg_hi and q is None:
+                count = min(SIEVE_WINDOW, (seg_hi - c) // 2 + 1)
+                flags = sieve_safe_window(c, count, limit)
+                for i in range(count):
+                    if flags[i] and _is_safe_pair(c + 2 * i):
+                        q = c + 2 * i
+                        break
+                c += 2 * count
+            if q is not None:
+                break
+    if q is None and lo <= 2 <= hi:
+        q = 2
+    if q is None:
+        raise ValueError(f"В диапазоне [{lo}, {hi}] нет q с простым 2q + 1")
+
+    p = 2 * q + 1
+    # порядок g делит 2q; g^2 != 1 и g^q != 1 - значит g образующая
+    while True:
+        g = random.randint(2, p - 2) if p > 5 else 2
+        if fast_pow(g, q, p) != 1 and fast_pow(g, 2, p) != 1:
+            return p, q, g
+
+
+def random_schnorr_group(q_bits):
+    """Параметры (p, q, g): простое q длины q_bits, простое p = kq + 1
+    с наименьшим чётным k и g порядка q по модулю p (ГОСТ Р 34.10-94, DSA).
+    """
+    q = random_prime(q_bits)
+    k = 2
+    while not is_prime(k * q + 1):
+        k += 2
+    p = k * q + 1
+    while True:
+        h = random.randint(2, p - 2)
+        g = fast_pow(h, k, p)
+        if g != 1:
+            return p, q, g
+
+
+def _pollard_brent(n):
+    """Нетривиальный делитель составного n (ро-метод Полларда, вариант Брента)"""
+    if n % 2 == 0:
+        return 2
+    m = 128  # сколько разностей копится в произведении до одного НОД
+    while True:
+        y, c = random.randrange(1, n), random.randrange(1, n)
+        g = r = q = 1
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in range(min(m, r - k)):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+                g = math.gcd(q, n)
+                k += m
+            r *= 2
+        if g == n:
+            # произведение проскочило делитель - повторяем по одному шагу
+            g = 1
+            while g == 1:
+                ys = (ys * ys + c) % n
+                g = math.gcd(abs(x - ys), n)
+        if g != n:
+            return g
+
+
+def factorize(n):
+    """Разложение n > 0 на простые: {простое: степень}"""
+    factors = {}
+    for r in (2, *SIEVE_PRIMES):
+        if r * r > n:
+            break
+        while n % r == 0:
+            factors[r] = factors.get(r, 0) + 1
+            n //= r
+    stack = [n] if n > 1 else []
+    while stack:
+        m = stack.pop()
+        if is_prime(m):
+            factors[m] = factors.get(m, 0) + 1
+            continue
+        d = _pollard_brent(m)
+        stack += [d, m // d]
+    return dict(sorted(factors.items()))
@@ -2,77 +2,30 @@ import random
 import json
 import os
 from pathlib import Path
-
-def extended_gcd(a, b):
-    """Нахождение НОД"""
-    U = [a, 1, 0]
-    V = [b, 0, 1]
-
-    while V[0] != 0:
-        q = U[0] // V[0]
-        T = [U[0] % V[0], U[1] - q * V[1], U[2] - q * V[2]]
-        U = V
-        V = T
-    return U
-
-def fast_pow(a, x, p):
-    """Быстрое возведение в степень"""
-    y = 1
-    a = a % p
-    
-    while x > 0:
-        if x & 1:
-            y = (y * a) % p
-        a = (a * a) % p
-        x >>= 1
-    
-    return y
-
-def ferm_test(n):
-    """Проверка на простоту"""
-    k = 50
-    
-    if n <= 1:
-        return False
-    if n <= 3:
-        return True
-    if n % 2 == 0:
-        return False
-    
-    for _ in range(k):
-        a = random.randint(2, n - 2)
-        if fast_pow(a, n - 1, n) != 1:
-            return False
-    
-    return True
+from modarith import gcd_only, fast_pow, ModContext
+from primes import random_primes
 
 class FiatShamirServer:
     """Серверная часть протокола Фиата-Шамира"""
     
     def __init__(self):
         self.N = 0 # Модуль N = p*q
+        self.ctx = None # Контекст модуля N
         self.p = 0 # Секретное простое p
         self.q = 0 # Секретное простое q
         self.users_file = "users.json"
         self.users = {}
         self.current_session = {}
         
-    def generate_N(self):
-        """Генерация модуля N = p*q"""
+    def generate_N(self, workers=None):
+        """Генерация модуля N = p*q (workers - число процессов поиска простых)"""
         print("СЕРВЕР: Генерация модуля N...")
         # Генерируем простые числа p и q
-        while True:
-            self.p = random.randint(2**511, 2**512)  # 512-битные простые
-            if ferm_test(self.p):
-                break
-        
-        while True:
-            self.q = random.randint(2**511, 2**512)
-            if ferm_test(self.q) and self.q != self.p:
-                break
+        self.p, self.q = random_primes(512, 2, workers)  # 512-битные простые
         
         # Вычисляем параметры
         self.N = self.p * self.q
+        self.ctx = ModContext(self.N)
         
         print(f"СЕРВЕР: p = {self.p}")
         print(f"СЕРВЕР: q = {self.q}")
@@ -181,8 +134,8 @@ class FiatShamirServer:
         e = self.current_session['e_sent']
         
         # Проверяем: y^2 ≡ x * v^e mod N
-        left_side = (y * y) % self.N
-        right_side = (x * fast_pow(v, e, self.N)) % self.N
+        left_side = self.ctx.sqr(y % self.N)
+        right_side = self.ctx.mul(x, self.ctx.pow(v, e))
         
         print(f"СЕРВЕР: Проверка раунда {self.current_session['current_round']}:")
         print(f"  y^2 mod N = {left_side}")
@@ -239,7 +192,7 @@ class FiatShamirClient:
         # Выбираем s, взаимно простое с N
         while True:
             self.s = random.randint(2, N - 2)
-            if extended_gcd(self.s, N)[0] == 1:
+            if gcd_only(self.s, N) == 1:
                 break
         
         # Вычисляем v = s^2 mod N
@@ -248,7 +201,7 @@ class FiatShamirClient:
         print(f"КЛИЕНТ: Сгенерированы ключи для {username}:")
         print(f"  Секретный ключ s = {self.s}")
         print(f"  Открытый ключ v = s^2 mod N = {self.v}")
-        print(f"  Проверка: gcd(s, N) = {extended_gcd(self.s, N)[0]} (должно быть 1)")
+        print(f"  Проверка: gcd(s, N) = {gcd_only(self.s, N)} (должно быть 1)")
         
         return self.v
     
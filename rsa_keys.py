@@ -0,0 +1,88 @@
+"""Закрытые ключи RSA с ускорением по китайской теореме об остатках.
+
+Если известны простые множители модуля, x^e mod n считается как
+возведения в степень по модулям меньшей длины с показателями
+e mod (r - 1) для каждого простого r и объединение по Гарнеру.
+Модуль может состоять из двух и более простых (многопростой RSA).
+"""
+import math
+from modarith import fast_pow, mod_inverse, pow_many
+from primes import random_primes
+
+
+def fits_exponent(primes, e):
+    """Обратим ли показатель e по модулю φ для модуля из данных простых"""
+    return e is None or all(math.gcd(e, r - 1) == 1 for r in primes)
+
+
+def generate_rsa_primes(bits, nprimes=2, workers=None, public_exponent=None):
+    """nprimes различных простых длины bits // nprimes для модуля около bits бит.
+
+    Простые ищутся одновременно в workers процессах (см. random_primes).
+    При заданном public_exponent простые r с НОД(e, r - 1) != 1 отбрасываются.
+    """
+    if nprimes < 2:
+        raise ValueError("Модуль RSA должен состоять хотя бы из двух простых")
+    primes = []
+    while len(primes) < nprimes:
+        for r in random_primes(bits // nprimes, nprimes - len(primes), workers, exclude=primes):
+            if fits_exponent((r,), public_exponent):
+                primes.append(r)
+    return primes
+
+
+class RSAPrivateKey:
+    """Закрытый ключ RSA: модуль n, закрытый показатель и, если известны,
+    простые множители n.
+
+    Нотация показателей в лабораторных разная (в lab6/lab8 закрытый - c,
+    в lab13 - d), поэтому здесь он называется просто exponent.
+    """
+
+    def __init__(self, n, exponent, *primes):
+        self.n = n
+        self.exponent = exponent
+        self.primes = tuple(r for r in primes if r)
+        if self.primes:
+            prod = 1
+            for r in self.primes:
+                prod *= r
+            if prod != n or len(self.primes) < 2:
+                raise ValueError("Произведение простых не равно модулю n")
+            self.exps = [exponent % (r - 1) for r in self.primes]
+            # coeffs[i] = (r_0 * ... * r_(i-1))^-1 mod r_i
+            self.coeffs = []
+            prod = 1
+            for r in self.primes:
+                self.coeffs.append(mod_inverse(prod % r, r))
+                prod *= r
+
+    @property
+    def has_crt(self):
+        return bool(self.primes)
+
+    def pow(self, x):
+        """x^exponent mod n"""
+        if not self.has_crt:
+            return fast_pow(x, self.exponent, self.n)
+        m = 0
+        prod = 1
+        for r, e, coeff in zip(self.primes, self.exps, self.coeffs):
+            # Гарнер: m += prod * ((x^e mod r - m) * prod^-1 mod r)
+            h = (fast_pow(x % r, e, r) - m) * coeff % r
+            m += prod * h
+            prod *= r
+        return m
+
+    def pow_many(self, xs):
+        """[x^exponent mod n для x из xs], по каждому простому - одним pow_many"""
+        if not self.has_crt:
+            return pow_many(xs, self.exponent, self.n)
+        result = [0] * len(xs)
+        prod = 1
+        for r, e, coeff in zip(self.primes, self.exps, self.coeffs):
+            ys = pow_many([x % r for x in xs], e, r)
+            for i, y in enumerate(ys):
+                result[i] += prod * ((y - result[i]) * coeff % r)
+            prod *= r
+        return result
@@ -1,4 +1,4 @@
-from lab1 import ferm_test, extended_gcd, fast_pow
+from modarith import ferm_test, extended_gcd, fast_pow
 
 p =17
 q=7
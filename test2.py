@@ -2,7 +2,9 @@ import os
 import random
 import struct
 from typing import List, Tuple
-from lab1 import ferm_test, fast_pow, extended_gcd
+from modarith import fast_pow, gcd_only, inverse_only
+from primes import random_safe_prime
+from rsa_keys import RSAPrivateKey
 
 def choose_block_size_for_N(N: int) -> int:
     if N <= 2:
@@ -21,38 +23,28 @@ def rsa_decrypt_block(e_val: int, N: int, c: int) -> int:
 def three_party_protocol():
 
     print("\n1. Генерация ключей Алисы:")
-    while True:
-        q_a = random.randint(1000000, 1000000000)
-        if ferm_test(q_a):
-            p_a = 2 * q_a + 1
-            if ferm_test(p_a):
-                break
+    p_a, q_a, _ = random_safe_prime(lo=1000000, hi=1000000000)
     N_a = p_a * q_a
     phi_a = (p_a - 1) * (q_a - 1)
     while True:
         d_a = random.randint(2, phi_a - 1)
-        if extended_gcd(d_a, phi_a)[0] == 1:
+        if gcd_only(d_a, phi_a) == 1:
             break
-    g, xinv, y = extended_gcd(d_a, phi_a)
-    c_a = xinv % phi_a
+    c_a = inverse_only(d_a, phi_a)
+    key_a = RSAPrivateKey(N_a, c_a, p_a, q_a)
     
     print(f"Алиса: N_a={N_a}, d_a={d_a}, c_a={c_a}")
     
     print("\n2. Генерация ключей Боба:")
-    while True:
-        q_b = random.randint(1000000, 1000000000)
-        if ferm_test(q_b):
-            p_b = 2 * q_b + 1
-            if ferm_test(p_b):
-                break
+    p_b, q_b, _ = random_safe_prime(lo=1000000, hi=1000000000)
     N_b = p_b * q_b
     phi_b = (p_b - 1) * (q_b - 1)
     while True:
         d_b = random.randint(2, phi_b - 1)
-        if extended_gcd(d_b, phi_b)[0] == 1:
+        if gcd_only(d_b, phi_b) == 1:
             break
-    g, xinv, y = extended_gcd(d_b, phi_b)
-    c_b = xinv % phi_b
+    c_b = inverse_only(d_b, phi_b)
+    key_b = RSAPrivateKey(N_b, c_b, p_b, q_b)
     
     print(f"Боб: N_b={N_b}, d_b={d_b}, c_b={c_b}")
     
@@ -71,7 +63,7 @@ def three_party_protocol():
         m = int.from_bytes(block, byteorder='big')
         if m >= N_a:
             raise ValueError(f"Блок слишком велик для N_a")
-        e = rsa_encrypt_block(m, N_a, c_a)  # e = m^c_A mod N_a
+        e = key_a.pow(m)  # e = m^c_A mod N_a
         alice_encrypted.append(e)
     
     double_encrypted = []
@@ -83,7 +75,7 @@ def three_party_protocol():
     
     bob_decrypted = []
     for f_val in double_encrypted:
-        u = rsa_decrypt_block(f_val, N_b, c_b)  # u = f^c_B mod N_b
+        u = key_b.pow(f_val)  # u = f^c_B mod N_b
         bob_decrypted.append(u)
     
     final_decrypted = bytearray()
@@ -0,0 +1,141 @@
+"""Векторное возведение в степень по модулю p < 2^32 (numpy).
+
+Все блоки файла лежат в одном массиве uint64 и возводятся в степень
+одновременно: на каждый бит показателя - одна-две операции над массивом.
+Для p < 2^32 вычеты меньше 2^32, и произведение двух вычетов помещается
+в uint64 без переполнения. Для p < 2^52 есть mul_wide: частное
+оценивается в float64, остаток считается в uint64 с переносом.
+
+numpy - необязательная зависимость: без неё supports() возвращает False,
+и лабораторные работают по-блочно через fast_pow.
+"""
+import random
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Модули меньше этой границы обрабатываются векторно
+VEC_MAX_MODULUS = 1 << 32
+# Граница для mul_wide: частное a*b/p должно считаться в float64 с ошибкой
+# не больше нескольких единиц
+VEC_WIDE_MAX_MODULUS = 1 << 52
+
+
+def supports(p):
+    """Можно ли считать по модулю p векторно"""
+    return np is not None and 2 <= p < VEC_MAX_MODULUS
+
+
+def supports_wide(p):
+    """Можно ли умножать по модулю p через mul_wide"""
+    return np is not None and 2 <= p < VEC_WIDE_MAX_MODULUS
+
+
+def mul_array(a, b, p):
+    """a * b mod p поэлементно"""
+    P = np.uint64(p)
+    return (np.asarray(a, dtype=np.uint64) % P) * (np.asarray(b, dtype=np.uint64) % P) % P
+
+
+def mul_wide(a, b, p):
+    """a * b mod p поэлементно для a, b < p < 2^52.
+
+    q = floor(a*b/p) в float64 ошибается на несколько единиц, а a*b - q*p
+    в uint64 верно по модулю 2^64; как int64 это истинный остаток плюс
+    малое кратное p, которое убирает последнее % p.
+    """
+    a = np.asarray(a, dtype=np.uint64)
+    b = np.asarray(b, dtype=np.uint64)
+    q = (a.astype(np.float64) * b.astype(np.float64) / float(p)).astype(np.uint64)
+    with np.errstate(over='ignore'):
+        r = (a * b - q * np.uint64(p)).view(np.int64)
+    return (r % np.int64(p)).view(np.uint64)
+
+
+def pow_array(bases, exponent, p):
+    """bases^exponent mod p поэлементно.
+
+    exponent - одно число или массив показателей той же длины, что bases.
+    bases может быть одним числом при массиве показателей (например, g^k
+    для своих k на каждый блок): тогда квадраты основания считаются
+    как обычные числа.
+    Как и fast_pow, для показателя <= 0 возвращает 1.
+    """
+    if not supports(p):
+        raise ValueError(f"Модуль {p} не подходит для векторного возведения в степень")
+    P = np.uint64(p)
+    one = np.uint64(1)
+
+    if np.ndim(bases) == 0 and np.ndim(exponent) > 0:
+        exps = np.asarray(exponent, dtype=np.int64)
+        e = np.where(exps > 0, exps, 0).astype(np.uint64)
+        result = np.ones(e.shape, dtype=np.uint64)
+        base = int(bases) % p
+        while e.any():
+            odd = (e & one).astype(bool)
+            result[odd] = result[odd] * np.uint64(base) % P
+            e >>= one
+            base = base * base % p
+        return result
+
+    base = np.asarray(bases, dtype=np.uint64) % P
+    result = np.ones_like(base)
+
+    if np.ndim(exponent) == 0:
+        e = int(exponent)
+        if e <= 0:
+            return result
+        # справа налево: result *= base для единичных битов, base возводится в квадрат
+        while True:
+            if e & 1:
+                result = result * base % P
+            e >>= 1
+            if not e:
+                return result
+            base = base * base % P
+
+    exps = np.asarray(exponent, dtype=np.int64)
+    if exps.shape != base.shape:
+        raise ValueError("Число показателей не совпадает с числом оснований")
+    e = np.where(exps > 0, exps, 0).astype(np.uint64)
+    while e.any():
+        odd = (e & one).astype(bool)
+        result = np.where(odd, result * base % P, result)
+        e >>= one
+        base = base * base % P
+    return result
+
+
+def randint_array(lo, hi, count):
+    """count случайных целых из [lo, hi], как random.randint.
+
+    Генератор numpy получает зерно из random, поэтому random.seed
+    по-прежнему воспроизводит результат.
+    """
+    rng = np.random.default_rng(random.getrandbits(64))
+    return rng.integers(lo, hi, size=count, endpoint=True, dtype=np.int64)
+
+
+def blocks_from_bytes(data, size):
+    """Блоки по size байт (big-endian, size <= 4) как массив uint64.
+
+    Последний блок дополняется нулями, как в поблочных циклах лабораторных.
+    """
+    if len(data) % size:
+        data = data + b'\x00' * (size - len(data) % size)
+    raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, size).astype(np.uint64)
+    blocks = np.zeros(raw.shape[0], dtype=np.uint64)
+    for j in range(size):
+        blocks = (blocks << np.uint64(8)) | raw[:, j]
+    return blocks
+
+
+def blocks_to_bytes(blocks, size):
+    """Обратно к blocks_from_bytes: каждый блок в size байт big-endian"""
+    blocks = np.asarray(blocks, dtype=np.uint64)
+    raw = np.empty((blocks.shape[0], size), dtype=np.uint8)
+    for j in range(size):
+        raw[:, size - 1 - j] = (blocks >> np.uint64(8 * j)) & np.uint64(0xFF)
+    return raw.tobytes()